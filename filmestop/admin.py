@@ -1,3 +1,137 @@
-from django.contrib import admin
+"""
+Administração do Django para os modelos do FilmesTop.
 
-# Register your models here.
+As tabelas de aluguéis e notas são grandes, então as páginas de listagem evitam o custo de
+`COUNT(*)` (usando a estimativa do PostgreSQL), carregam as chaves estrangeiras com um único JOIN,
+usam `raw_id_fields` em vez de carregar todas as opções dos selects e buscam apenas por prefixo
+(`^`) ou igualdade, que são atendidos pelos índices em `UPPER(...)` e pelas chaves estrangeiras.
+As ações em lote são executadas como um único UPDATE/DELETE.
+"""
+
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+
+from .models import Usuario, Genero, Filme, Aluguel, Nota
+from .repositories.repositories import FilmeRepository, GeneroRepository
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginador que, no PostgreSQL e em listagens sem filtro, usa a estimativa de linhas do
+    catálogo (`pg_class.reltuples`) em vez de `COUNT(*)`. Tabelas pequenas, listagens filtradas
+    e outros bancos continuam usando a contagem exata.
+    """
+
+    limite_contagem_exata = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            tabela = queryset.model._meta.db_table
+            with connection.cursor() as cursor:
+                # Soma também as partições, já que a tabela de aluguéis pode estar particionada.
+                cursor.execute(
+                    "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint FROM pg_class c "
+                    "WHERE c.oid = to_regclass(%s) "
+                    "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))",
+                    [tabela, tabela],
+                )
+                estimativa = cursor.fetchone()[0]
+            if estimativa >= self.limite_contagem_exata:
+                return estimativa
+        return super().count
+
+
+class TabelaGrandeAdmin(admin.ModelAdmin):
+    """
+    Configuração base para tabelas grandes.
+    """
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Usuario)
+class UsuarioAdmin(TabelaGrandeAdmin):
+    list_display = ('email', 'nome', 'celular')
+    search_fields = ('^email', '^nome')
+
+
+@admin.register(Genero)
+class GeneroAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'total_filmes')
+    search_fields = ('nome',)
+    readonly_fields = ('total_filmes',)
+    actions = ('recalcular_totais',)
+
+    @admin.action(description='Recalcular total de filmes de todos os gêneros')
+    def recalcular_totais(self, request, queryset):
+        GeneroRepository.recalcular_totais()
+        self.message_user(request, 'Totais de filmes recalculados.', messages.SUCCESS)
+
+
+@admin.register(Filme)
+class FilmeAdmin(TabelaGrandeAdmin):
+    list_display = ('nome', 'genero', 'ano', 'diretor', 'total_avaliacoes', 'nota_final')
+    list_select_related = ('genero',)
+    list_filter = ('genero',)
+    search_fields = ('^nome',)
+    actions = ('recalcular_avaliacoes',)
+
+    @admin.action(description='Recalcular total de avaliações, nota final e histograma')
+    def recalcular_avaliacoes(self, request, queryset):
+        with transaction.atomic():
+            atualizados = FilmeRepository.recalcular_avaliacoes(queryset)
+            FilmeRepository.reconstruir_histogramas(queryset)
+        self.message_user(request, f'{atualizados} filmes recalculados.', messages.SUCCESS)
+
+
+@admin.register(Aluguel)
+class AluguelAdmin(TabelaGrandeAdmin):
+    list_display = ('id', 'usuario', 'filme', 'data_de_locacao')
+    list_select_related = ('usuario', 'filme')
+    raw_id_fields = ('usuario', 'filme')
+    search_fields = ('usuario__email__exact', 'filme__nome__exact')
+    # Intervalos fixos (hoje, últimos 7 dias, este mês, este ano): ao contrário de `date_hierarchy`,
+    # não executam um SELECT DISTINCT sobre a tabela inteira a cada listagem.
+    list_filter = ('data_de_locacao',)
+    actions = ('excluir_alugueis',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # A ação padrão carrega e lista todos os objetos antes de excluir.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Excluir aluguéis selecionados', permissions=['delete'])
+    def excluir_alugueis(self, request, queryset):
+        excluidos, _ = queryset.delete()
+        self.message_user(request, f'{excluidos} aluguéis excluídos.', messages.SUCCESS)
+
+
+@admin.register(Nota)
+class NotaAdmin(TabelaGrandeAdmin):
+    list_display = ('id', 'usuario', 'filme', 'nota_atribuida_ao_filme')
+    list_select_related = ('usuario', 'filme')
+    raw_id_fields = ('usuario', 'filme')
+    search_fields = ('usuario__email__exact', 'filme__nome__exact')
+    actions = ('excluir_notas',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # A ação padrão carrega e lista todos os objetos antes de excluir.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Excluir notas selecionadas e recalcular os filmes', permissions=['delete'])
+    def excluir_notas(self, request, queryset):
+        with transaction.atomic():
+            filmes = Filme.objects.filter(pk__in=list(queryset.order_by().values_list('filme_id', flat=True).distinct()))
+            excluidas, _ = queryset.delete()
+            FilmeRepository.recalcular_avaliacoes(filmes)
+            FilmeRepository.reconstruir_histogramas(filmes)
+        self.message_user(request, f'{excluidas} notas excluídas.', messages.SUCCESS)
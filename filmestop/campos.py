@@ -0,0 +1,44 @@
+"""
+Seleção de campos (`?fields=`) nas views de leitura.
+
+Cada view declara, uma única vez, os campos que podem ser solicitados. O parâmetro `fields` da
+URL (ex.: `?fields=nome,genero`) é validado contra esse conjunto e convertido na tupla de campos
+repassada aos repositórios, que a aplicam em `values()`; assim, colunas não solicitadas nunca são
+lidas do banco nem serializadas. Sem o parâmetro, todos os campos são retornados.
+"""
+
+from functools import lru_cache
+
+
+class CamposSelecionaveis:
+    """
+    Conjunto de campos que uma view permite selecionar.
+
+    Atributos:
+        campos (tuple): Todos os campos, na ordem padrão da resposta.
+        permitidos (frozenset): Os mesmos campos, para validação.
+    """
+
+    def __init__(self, campos):
+        self.campos = tuple(campos)
+        self.permitidos = frozenset(self.campos)
+        # O resultado de cada valor distinto de `fields` é guardado, então requisições repetidas
+        # não voltam a interpretar nem validar o parâmetro.
+        self.interpretar = lru_cache(maxsize=256)(self._interpretar)
+
+    def _interpretar(self, parametro):
+        if parametro is None:
+            return self.campos
+
+        solicitados = tuple(dict.fromkeys(campo.strip() for campo in parametro.split(',') if campo.strip()))
+        invalidos = [campo for campo in solicitados if campo not in self.permitidos]
+
+        if not solicitados or invalidos:
+            raise ValueError(f'Campos inválidos: {", ".join(invalidos) or parametro}. Campos permitidos: {", ".join(self.campos)}.')
+        return solicitados
+
+    def da_requisicao(self, request):
+        """
+        Retorna a tupla de campos solicitados na requisição. Lança ValueError se algum campo não for permitido.
+        """
+        return self.interpretar(request.GET.get('fields'))
@@ -0,0 +1,32 @@
+"""
+Verificações de sistema (`manage.py check`) do FilmesTop.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+BACKEND_LOCAL = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def verificar_cache_de_filmes(app_configs, **kwargs):
+    """
+    Recusa o cache por filme em memória local: a invalidação feita por um worker não chegaria aos demais,
+    que continuariam servindo o filme antigo até o fim de `FILME_CACHE_TIMEOUT`.
+    """
+    if settings.FILME_CACHE_TIMEOUT <= 0:
+        return []
+
+    configuracao = settings.CACHES.get(settings.FILME_CACHE_ALIAS)
+    if configuracao is None:
+        return [Error(
+            f"FILME_CACHE_ALIAS '{settings.FILME_CACHE_ALIAS}' não está definido em CACHES.",
+            id='filmestop.E002',
+        )]
+    if configuracao['BACKEND'] == BACKEND_LOCAL:
+        return [Error(
+            'FILME_CACHE_TIMEOUT > 0 exige um cache compartilhado entre os workers.',
+            hint='Configure CACHE_URL com um Redis (redis://...) ou Memcached (memcache://...).',
+            id='filmestop.E001',
+        )]
+    return []
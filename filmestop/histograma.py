@@ -0,0 +1,95 @@
+"""
+Histograma de notas por filme.
+
+Cada filme guarda um vetor fixo de 21 contadores inteiros, um para cada nota de 0.0 a 10.0 em
+passos de 0.5. Uma nota é contada na faixa mais próxima (ex.: 7.3 conta como 7.5 e 7.2 como 7.0).
+A distribuição, a mediana e os percentis são calculados a partir do vetor, em tempo proporcional
+ao número de faixas, sem consultar a tabela de notas.
+"""
+
+import math
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Floor
+
+PASSO = 0.5
+TOTAL_FAIXAS = int(10 / PASSO) + 1
+PERCENTIS = (10, 25, 50, 75, 90)
+
+
+def histograma_vazio():
+    """
+    Retorna um histograma sem nenhuma nota.
+    """
+    return [0] * TOTAL_FAIXAS
+
+
+def indice_da_nota(nota):
+    """
+    Retorna o índice da faixa correspondente à nota (arredondamento para a faixa mais próxima).
+    """
+    return min(max(math.floor(nota / PASSO + 0.5), 0), TOTAL_FAIXAS - 1)
+
+
+def valor_da_faixa(indice):
+    """
+    Retorna a nota representada pela faixa de índice informado.
+    """
+    return indice * PASSO
+
+
+def adicionar_nota(histograma, nota):
+    """
+    Retorna um novo histograma com a nota informada contabilizada.
+    """
+    histograma = list(histograma or histograma_vazio())
+    histograma[indice_da_nota(nota)] += 1
+    return histograma
+
+
+def percentil(histograma, p):
+    """
+    Retorna o percentil `p` (0 a 100) das notas pelo método do posto mais próximo,
+    ou None se o histograma estiver vazio.
+    """
+    total = sum(histograma)
+    if not total:
+        return None
+
+    posto = max(math.ceil(p / 100 * total), 1)
+    acumulado = 0
+    for indice, quantidade in enumerate(histograma):
+        acumulado += quantidade
+        if acumulado >= posto:
+            return valor_da_faixa(indice)
+
+
+def resumo(histograma):
+    """
+    Retorna a distribuição, a mediana e os percentis das notas do histograma.
+    """
+    return {
+        'distribuicao': {f'{valor_da_faixa(indice):.1f}': quantidade for indice, quantidade in enumerate(histograma)},
+        'mediana': percentil(histograma, 50),
+        'percentis': {f'p{p}': percentil(histograma, p) for p in PERCENTIS},
+    }
+
+
+def histogramas_por_filme(notas):
+    """
+    Calcula os histogramas de todos os filmes do queryset de notas com uma única consulta agrupada
+    por filme e faixa. Retorna um dicionário nome do filme -> histograma.
+    """
+    faixas = (
+        notas.filter(nota_atribuida_ao_filme__isnull=False)
+        .annotate(faixa=Floor(F('nota_atribuida_ao_filme') / Value(PASSO) + Value(0.5)))
+        .order_by()
+        .values('filme_id', 'faixa')
+        .annotate(quantidade=Count('id'))
+    )
+
+    histogramas = {}
+    for linha in faixas:
+        histograma = histogramas.setdefault(linha['filme_id'], histograma_vazio())
+        histograma[min(max(int(linha['faixa']), 0), TOTAL_FAIXAS - 1)] += linha['quantidade']
+    return histogramas
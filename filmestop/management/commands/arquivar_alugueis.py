@@ -0,0 +1,96 @@
+"""
+Comando `arquivar_alugueis`.
+
+Move os aluguéis de meses antigos para arquivos compactados (JSONL + gzip, um arquivo por mês e
+execução, sem sobrescrever arquivos anteriores) e os remove do banco. Os meses mais recentes,
+definidos por `ALUGUEL_MESES_RETIDOS`, permanecem no banco, de forma que `VerFilmesAlugadosView`
+continua retornando o histórico recente.
+
+Com o particionamento ativo, a partição do mês arquivado é desanexada e removida, o que evita
+um DELETE linha a linha; caso contrário, as linhas são removidas com um DELETE por mês.
+
+Uso:
+    python manage.py arquivar_alugueis --meses-retidos 12 --destino /var/lib/filmestop/arquivo
+"""
+
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from filmestop import particionamento
+from filmestop.models import Aluguel
+
+
+class Command(BaseCommand):
+    help = 'Arquiva em arquivos JSONL compactados os aluguéis anteriores ao período retido.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses-retidos', type=int, default=settings.ALUGUEL_MESES_RETIDOS, help='Meses de histórico mantidos no banco.')
+        parser.add_argument('--destino', default=settings.ALUGUEL_ARQUIVO_DIR, help='Diretório onde os arquivos serão gravados.')
+        parser.add_argument('--tamanho-lote', type=int, default=2000, help='Quantidade de linhas lidas do banco por vez.')
+
+    def handle(self, *args, **options):
+        mes_atual = particionamento.inicio_do_mes(timezone.localdate())
+        corte = particionamento.somar_meses(mes_atual, -options['meses_retidos'])
+        os.makedirs(options['destino'], exist_ok=True)
+
+        meses = Aluguel.objects.filter(data_de_locacao__lt=corte).dates('data_de_locacao', 'month')
+        for mes in meses:
+            total = self.arquivar_mes(mes, options['destino'], options['tamanho_lote'])
+            self.stdout.write(f'{total} aluguéis de {mes:%m/%Y} arquivados.')
+
+    def arquivar_mes(self, mes, destino, tamanho_lote):
+        """
+        Grava os aluguéis do mês em um arquivo compactado e os remove do banco.
+        """
+        alugueis = Aluguel.objects.filter(
+            data_de_locacao__gte=mes,
+            data_de_locacao__lt=particionamento.somar_meses(mes, 1),
+        )
+        temporario = os.path.join(destino, f'alugueis_{mes:%Y%m}.jsonl.gz.tmp')
+
+        total = 0
+        with gzip.open(temporario, 'wt', encoding='utf-8') as arquivo:
+            linhas = alugueis.order_by('id').values('id', 'usuario_id', 'filme_id', 'data_de_locacao')
+            for linha in linhas.iterator(chunk_size=tamanho_lote):
+                arquivo.write(json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False))
+                arquivo.write('\n')
+                total += 1
+
+        self.publicar(temporario, destino, mes)
+
+        with transaction.atomic():
+            if particionamento.particionamento_ativo():
+                with connection.cursor() as cursor:
+                    if particionamento.particao_existe(cursor, mes):
+                        particionamento.remover_particao(cursor, mes)
+                        return total
+            alugueis.delete()
+        return total
+
+    @staticmethod
+    def publicar(temporario, destino, mes):
+        """
+        Dá ao arquivo completo o primeiro nome livre do mês (`alugueis_AAAAMM.jsonl.gz`,
+        `alugueis_AAAAMM_1.jsonl.gz`, ...) e retorna o caminho. Arquivos existentes nunca são
+        sobrescritos: aluguéis de um mês já arquivado que voltem ao banco (ex.: importações) vão
+        para um novo arquivo, sem apagar o arquivo anterior.
+        """
+        sufixo = 0
+        while True:
+            nome = f'alugueis_{mes:%Y%m}_{sufixo}.jsonl.gz' if sufixo else f'alugueis_{mes:%Y%m}.jsonl.gz'
+            caminho = os.path.join(destino, nome)
+            try:
+                # `os.link` falha se o destino existir, ao contrário de `os.replace`.
+                os.link(temporario, caminho)
+            except FileExistsError:
+                sufixo += 1
+                continue
+            os.remove(temporario)
+            return caminho
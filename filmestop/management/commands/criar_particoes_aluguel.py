@@ -0,0 +1,55 @@
+"""
+Comando `criar_particoes_aluguel`.
+
+Cria as partições mensais da tabela de aluguéis para o mês atual e os próximos meses. Na
+primeira execução com o particionamento habilitado, converte a tabela comum em particionada.
+Aluguéis desses meses gravados antes da criação da partição (na partição padrão) são movidos para
+ela. Cada mês é criado em uma transação; meses com falha são informados e o comando termina com erro.
+Em bancos sem suporte (ou com `ALUGUEL_PARTICIONADO` desabilitado) não faz nada.
+
+Uso:
+    python manage.py criar_particoes_aluguel --meses 3
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from filmestop import particionamento
+
+
+class Command(BaseCommand):
+    help = 'Cria as partições mensais futuras da tabela de aluguéis (somente PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=3, help='Quantidade de meses futuros a criar além do mês atual.')
+
+    def handle(self, *args, **options):
+        if not particionamento.particionamento_ativo():
+            self.stdout.write('Particionamento desabilitado ou não suportado por este banco; a tabela de aluguéis permanece comum.')
+            return
+
+        mes_atual = particionamento.inicio_do_mes(timezone.localdate())
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not particionamento.tabela_particionada(cursor):
+                particionamento.converter_para_particionada(cursor)
+                self.stdout.write('Tabela de aluguéis convertida para tabela particionada.')
+
+        # Cada mês é criado em sua própria transação: a falha de um mês não impede a criação dos demais.
+        falhas = []
+        for deslocamento in range(options['meses'] + 1):
+            mes = particionamento.somar_meses(mes_atual, deslocamento)
+            nome = particionamento.nome_da_particao(mes)
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    movidas = particionamento.criar_particao(cursor, mes)
+            except DatabaseError as erro:
+                falhas.append(nome)
+                self.stderr.write(f'Falha ao criar a partição {nome}: {erro}')
+                continue
+            if movidas:
+                self.stdout.write(f'{movidas} aluguéis movidos da partição padrão para {nome}.')
+            self.stdout.write(f'Partição {nome} disponível.')
+
+        if falhas:
+            raise CommandError(f"Partições não criadas: {', '.join(falhas)}.")
@@ -0,0 +1,78 @@
+"""
+Comando `medir_inicializacao`.
+
+Mede o tempo de inicialização de um worker importando o módulo WSGI em processos novos do Python
+com `-X importtime`. Para cada repetição registra o tempo total de importação e a memória residente
+máxima (RSS) do processo; ao final mostra as medianas e os pacotes que mais consomem tempo de
+importação (tempo próprio somado por pacote de primeiro nível).
+
+Uso:
+    python manage.py medir_inicializacao --repeticoes 5 --top 15
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Executado no processo filho: importa o módulo e imprime o tempo (ms) e o RSS máximo (KB no Linux).
+SCRIPT_FILHO = (
+    "import resource, time; inicio = time.perf_counter(); import {modulo}; "
+    "print((time.perf_counter() - inicio) * 1000, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo de importação e a memória de inicialização do módulo WSGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modulo', default='setup.wsgi', help='Módulo importado pelo servidor de aplicação.')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Quantidade de processos medidos.')
+        parser.add_argument('--top', type=int, default=15, help='Quantidade de pacotes listados no ranking.')
+
+    def handle(self, *args, **options):
+        tempos, memorias = [], []
+        tempo_por_pacote = defaultdict(list)
+
+        for _ in range(options['repeticoes']):
+            processo = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', SCRIPT_FILHO.format(modulo=options['modulo'])],
+                capture_output=True, text=True, env=os.environ.copy(),
+            )
+            if processo.returncode != 0:
+                raise CommandError(processo.stderr.strip().splitlines()[-1])
+
+            tempo_ms, rss_kb = processo.stdout.split()
+            tempos.append(float(tempo_ms))
+            memorias.append(int(rss_kb) / 1024)
+
+            for pacote, tempo in self.tempo_proprio_por_pacote(processo.stderr).items():
+                tempo_por_pacote[pacote].append(tempo)
+
+        self.stdout.write(f"Módulo: {options['modulo']} ({options['repeticoes']} repetições)")
+        self.stdout.write(f'Tempo de importação (mediana): {statistics.median(tempos):.1f} ms')
+        self.stdout.write(f'RSS máximo (mediana): {statistics.median(memorias):.1f} MB')
+        self.stdout.write('Pacotes com maior tempo de importação (mediana do tempo próprio):')
+
+        ranking = sorted(((statistics.median(t), p) for p, t in tempo_por_pacote.items()), reverse=True)
+        for tempo, pacote in ranking[:options['top']]:
+            self.stdout.write(f'  {tempo / 1000:8.1f} ms  {pacote}')
+
+    @staticmethod
+    def tempo_proprio_por_pacote(saida):
+        """
+        Soma o tempo próprio (em microssegundos) de cada linha de `-X importtime` pelo pacote de
+        primeiro nível do módulo importado.
+        """
+        tempos = defaultdict(int)
+        for linha in saida.splitlines():
+            if not linha.startswith('import time:'):
+                continue
+            proprio, _, modulo = linha[len('import time:'):].split('|')
+            if not proprio.strip().isdigit():
+                continue
+            tempos[modulo.strip().split('.')[0]] += int(proprio)
+        return tempos
@@ -0,0 +1,28 @@
+"""
+Comando `reconstruir_histogramas`.
+
+Recalcula o histograma de notas de todos os filmes (ou dos filmes informados) a partir da tabela
+de notas, com uma única consulta agrupada por filme e faixa e atualizações em lote.
+
+Uso:
+    python manage.py reconstruir_histogramas
+    python manage.py reconstruir_histogramas --filme "Filme X" --filme "Filme Y"
+"""
+
+from django.core.management.base import BaseCommand
+
+from filmestop.models import Filme
+from filmestop.repositories.repositories import FilmeRepository
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os histogramas de notas dos filmes a partir da tabela de notas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filme', action='append', dest='filmes', help='Nome do filme a recalcular (pode ser repetido).')
+        parser.add_argument('--tamanho-lote', type=int, default=1000, help='Quantidade de filmes por UPDATE em lote.')
+
+    def handle(self, *args, **options):
+        filmes = Filme.objects.filter(nome__in=options['filmes']) if options['filmes'] else None
+        total = FilmeRepository.reconstruir_histogramas(filmes=filmes, tamanho_lote=options['tamanho_lote'])
+        self.stdout.write(f'Histogramas recalculados para {total} filmes com notas.')
@@ -0,0 +1,89 @@
+"""
+Comando `relatorio_perfis`.
+
+Agrega os perfis gravados pelo `PerfilMiddleware` e mostra:
+
+- por URL: quantidade de perfis, duração mediana e máxima, e a fração do tempo gasta em SQL;
+- as funções com maior tempo próprio somado (caminhos quentes), com o tempo inclusivo;
+- as consultas SQL com maior tempo total.
+
+Uso:
+    python manage.py relatorio_perfis --top 20
+    python manage.py relatorio_perfis --url filmes_alugados
+"""
+
+import glob
+import json
+import os
+import statistics
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Agrega os perfis de requisições gravados em um ranking dos caminhos mais custosos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--diretorio', default=settings.PERFIL_DIR, help='Diretório dos perfis.')
+        parser.add_argument('--url', help='Considera apenas os perfis desta URL (nome da URL).')
+        parser.add_argument('--top', type=int, default=20, help='Quantidade de funções e consultas listadas.')
+
+    def handle(self, *args, **options):
+        perfis = self.carregar(options['diretorio'], options['url'])
+        if not perfis:
+            raise CommandError(f"Nenhum perfil encontrado em {options['diretorio']}.")
+
+        self.stdout.write(f'{len(perfis)} perfis analisados.\n')
+        self.resumo_por_url(perfis)
+        self.ranking_de_funcoes(perfis, options['top'])
+        self.ranking_de_consultas(perfis, options['top'])
+
+    @staticmethod
+    def carregar(diretorio, url):
+        padrao = os.path.join(diretorio, url or '*', '*.json')
+        perfis = []
+        for caminho in sorted(glob.glob(padrao)):
+            with open(caminho, encoding='utf-8') as arquivo:
+                perfis.append(json.load(arquivo))
+        return perfis
+
+    def resumo_por_url(self, perfis):
+        por_url = defaultdict(list)
+        for perfil in perfis:
+            por_url[perfil['url_name']].append(perfil)
+
+        self.stdout.write('Por URL (perfis, mediana, máximo, % em SQL, consultas por requisição):')
+        for url, lista in sorted(por_url.items(), key=lambda item: -sum(p['duracao_ms'] for p in item[1])):
+            duracoes = [perfil['duracao_ms'] for perfil in lista]
+            tempo_sql = sum(consulta['duracao_ms'] for perfil in lista for consulta in perfil['consultas'])
+            consultas = statistics.mean(len(perfil['consultas']) for perfil in lista)
+            self.stdout.write(
+                f'  {url:<30} {len(lista):>5} {statistics.median(duracoes):>9.1f} ms {max(duracoes):>9.1f} ms '
+                f'{100 * tempo_sql / max(sum(duracoes), 1e-9):>6.1f}% {consultas:>7.1f}'
+            )
+
+    def ranking_de_funcoes(self, perfis, top):
+        proprio = defaultdict(float)
+        inclusivo = defaultdict(float)
+        for perfil in perfis:
+            for rotulo, tempos in perfil['funcoes'].items():
+                proprio[rotulo] += tempos['proprio_ms']
+                inclusivo[rotulo] += tempos['inclusivo_ms']
+
+        self.stdout.write('\nFunções com maior tempo próprio (próprio, inclusivo):')
+        for rotulo in sorted(proprio, key=proprio.get, reverse=True)[:top]:
+            self.stdout.write(f'  {proprio[rotulo]:>10.1f} ms {inclusivo[rotulo]:>10.1f} ms  {rotulo}')
+
+    def ranking_de_consultas(self, perfis, top):
+        total = defaultdict(float)
+        execucoes = defaultdict(int)
+        for perfil in perfis:
+            for consulta in perfil['consultas']:
+                total[consulta['sql']] += consulta['duracao_ms']
+                execucoes[consulta['sql']] += 1
+
+        self.stdout.write('\nConsultas com maior tempo total (total, execuções):')
+        for sql in sorted(total, key=total.get, reverse=True)[:top]:
+            self.stdout.write(f'  {total[sql]:>10.1f} ms {execucoes[sql]:>6}  {sql[:200]}')
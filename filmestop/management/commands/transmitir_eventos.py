@@ -0,0 +1,44 @@
+"""
+Comando `transmitir_eventos`.
+
+Entrega os eventos da outbox (aluguéis e notas criados) a um destino, em lotes ordenados, salvando
+o offset do consumidor após cada lote.
+
+Uso:
+    python manage.py transmitir_eventos --destino ndjson --caminho /tmp/eventos.ndjson --consumidor analytics
+    python manage.py transmitir_eventos --destino meu_pacote.destinos.DestinoKafka --continuo
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from filmestop import outbox
+from filmestop.repositories.repositories import EventoRepository
+
+
+class Command(BaseCommand):
+    help = 'Entrega os eventos da outbox de aluguéis e notas a um destino.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', default='ndjson', help='Apelido (ndjson, memoria) ou caminho de importação da classe de destino.')
+        parser.add_argument('--caminho', help='Argumento repassado ao destino, ex.: arquivo do destino ndjson.')
+        parser.add_argument('--consumidor', help='Nome do consumidor cujo offset é usado. Padrão: o valor de --destino.')
+        parser.add_argument('--tamanho-lote', type=int, default=500, help='Quantidade de eventos por lote.')
+        parser.add_argument('--continuo', action='store_true', help='Continua executando, verificando novos eventos a cada intervalo.')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre verificações no modo contínuo.')
+        parser.add_argument('--limpar', action='store_true', help='Remove os eventos já entregues a todos os consumidores.')
+
+    def handle(self, *args, **options):
+        destino = outbox.carregar_destino(options['destino'], options['caminho'])
+        consumidor = options['consumidor'] or options['destino']
+
+        while True:
+            entregues = outbox.transmitir(destino, consumidor, options['tamanho_lote'])
+            if entregues:
+                self.stdout.write(f'{entregues} eventos entregues a {consumidor}.')
+            if options['limpar']:
+                EventoRepository.remover_eventos_entregues()
+            if not options['continuo']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:17
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Filme',
+            fields=[
+                ('nome', models.CharField(max_length=1000, primary_key=True, serialize=False, unique=True, verbose_name='Nome')),
+                ('genero', models.CharField(max_length=1000, verbose_name='Gênero')),
+                ('ano', models.DateField(verbose_name='Ano')),
+                ('sinopse', models.CharField(max_length=3000, verbose_name='Sinopse')),
+                ('diretor', models.CharField(max_length=1000, verbose_name='Diretor')),
+                ('total_avaliacoes', models.IntegerField(blank=True, default=0, verbose_name='Total de avaliações')),
+                ('nota_final', models.FloatField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(10)], verbose_name='Nota final')),
+            ],
+            options={
+                'unique_together': {('nome', 'genero', 'ano', 'sinopse', 'diretor', 'total_avaliacoes', 'nota_final')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Usuario',
+            fields=[
+                ('nome', models.CharField(max_length=1000, verbose_name='Nome')),
+                ('celular', models.CharField(max_length=100, unique=True, verbose_name='Celular')),
+                ('email', models.CharField(max_length=1000, primary_key=True, serialize=False, unique=True, verbose_name='Email')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Nota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nota_atribuida_ao_filme', models.FloatField(blank=True, null=True, unique=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(10)], verbose_name='Nota atribuída ao filme')),
+                ('filme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='filmestop.filme')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='filmestop.usuario')),
+            ],
+            options={
+                'unique_together': {('usuario', 'filme', 'nota_atribuida_ao_filme')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Aluguel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_de_locacao', models.DateField(auto_now_add=True, verbose_name='Data de locação')),
+                ('filme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='filmestop.filme')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='filmestop.usuario')),
+            ],
+            options={
+                'unique_together': {('usuario', 'filme')},
+            },
+        ),
+    ]
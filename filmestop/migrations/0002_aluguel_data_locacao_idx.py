@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluguel',
+            index=models.Index(fields=['data_de_locacao'], name='aluguel_data_locacao_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Índices de expressão em UPPER(...) com text_pattern_ops atendem tanto as buscas `__iexact`
+# usadas pelos repositórios quanto as buscas por prefixo (`__istartswith`) do admin.
+INDICES = [
+    ('filmestop_filme_nome_upper_idx', 'filmestop_filme', 'nome'),
+    ('filmestop_usuario_email_upper_idx', 'filmestop_usuario', 'email'),
+    ('filmestop_usuario_nome_upper_idx', 'filmestop_usuario', 'nome'),
+]
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, tabela, coluna in INDICES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{nome}" ON "{tabela}" (UPPER("{coluna}"::text) text_pattern_ops)'
+        )
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0002_aluguel_data_locacao_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
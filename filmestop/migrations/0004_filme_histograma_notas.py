@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:24
+
+from django.db import migrations, models
+from django.db.models.functions import Floor
+import filmestop.histograma
+
+# Cópia das regras de `filmestop.histograma` em vigor nesta migração, para que o preenchimento não
+# mude junto com o módulo. O default do campo continua referenciando o módulo, como o Django exige
+# para defaults chamáveis.
+PASSO = 0.5
+TOTAL_FAIXAS = int(10 / PASSO) + 1
+
+
+def histograma_vazio():
+    return [0] * TOTAL_FAIXAS
+
+
+def histogramas_por_filme(notas):
+    faixas = (
+        notas.filter(nota_atribuida_ao_filme__isnull=False)
+        .annotate(faixa=Floor(models.F('nota_atribuida_ao_filme') / models.Value(PASSO) + models.Value(0.5)))
+        .order_by()
+        .values('filme_id', 'faixa')
+        .annotate(quantidade=models.Count('id'))
+    )
+
+    histogramas = {}
+    for linha in faixas:
+        histograma = histogramas.setdefault(linha['filme_id'], histograma_vazio())
+        histograma[min(max(int(linha['faixa']), 0), TOTAL_FAIXAS - 1)] += linha['quantidade']
+    return histogramas
+
+
+def preencher_histogramas(apps, schema_editor):
+    Filme = apps.get_model('filmestop', 'Filme')
+    Nota = apps.get_model('filmestop', 'Nota')
+    histogramas = histogramas_por_filme(Nota.objects.all())
+    filmes = [Filme(nome=nome, histograma_notas=histograma) for nome, histograma in histogramas.items()]
+    Filme.objects.bulk_update(filmes, ['histograma_notas'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0003_indices_busca_case_insensitive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filme',
+            name='histograma_notas',
+            field=models.JSONField(blank=True, default=filmestop.histograma.histograma_vazio, verbose_name='Histograma de notas'),
+        ),
+        migrations.RunPython(preencher_histogramas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:25
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0004_filme_histograma_notas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Evento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=100, verbose_name='Tipo')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Payload')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OffsetDeConsumidor',
+            fields=[
+                ('consumidor', models.CharField(max_length=200, primary_key=True, serialize=False, verbose_name='Consumidor')),
+                ('ultimo_evento', models.BigIntegerField(default=0, verbose_name='Último evento')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+        ),
+    ]
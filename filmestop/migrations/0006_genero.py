@@ -0,0 +1,95 @@
+import unicodedata
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def chave_do_genero(nome):
+    """
+    Cópia de `filmestop.models.chave_do_genero` em vigor nesta migração.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', nome).split()).casefold()
+
+
+def normalizar_generos(apps, schema_editor):
+    """
+    Cria um gênero para cada valor distinto de `Filme.genero`, agrupando as grafias pela mesma
+    normalização de `Genero.chave` (`chave_do_genero`), e liga os filmes ao gênero criado. O nome
+    mantido é a grafia mais frequente.
+    """
+    Filme = apps.get_model('filmestop', 'Filme')
+    Genero = apps.get_model('filmestop', 'Genero')
+
+    grafias = defaultdict(Counter)
+    for valor, quantidade in Filme.objects.values_list('genero').annotate(quantidade=models.Count('pk')).order_by():
+        grafias[chave_do_genero(valor)][valor] += quantidade
+
+    for contagem in grafias.values():
+        nome = contagem.most_common(1)[0][0].strip()
+        genero = Genero.objects.create(nome=nome, total_filmes=sum(contagem.values()))
+        Filme.objects.filter(genero__in=list(contagem)).update(genero_novo=genero)
+
+
+def restaurar_generos(apps, schema_editor):
+    Filme = apps.get_model('filmestop', 'Filme')
+    Genero = apps.get_model('filmestop', 'Genero')
+
+    for genero in Genero.objects.all():
+        Filme.objects.filter(genero_novo=genero).update(genero=genero.nome)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0005_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Genero',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('nome', models.CharField(max_length=1000, verbose_name='Nome')),
+                ('total_filmes', models.IntegerField(default=0, verbose_name='Total de filmes')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Upper('nome'), name='genero_nome_unico')],
+            },
+        ),
+        migrations.AddField(
+            model_name='filme',
+            name='genero_novo',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='filmestop.genero'),
+        ),
+        # Torna a coluna antiga opcional para que a migração possa ser revertida antes de restaurar os valores.
+        migrations.AlterField(
+            model_name='filme',
+            name='genero',
+            field=models.CharField(max_length=1000, null=True, verbose_name='Gênero'),
+        ),
+        migrations.RunPython(normalizar_generos, restaurar_generos),
+        migrations.AlterUniqueTogether(
+            name='filme',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='filme',
+            name='genero',
+        ),
+        migrations.RenameField(
+            model_name='filme',
+            old_name='genero_novo',
+            new_name='genero',
+        ),
+        migrations.AlterField(
+            model_name='filme',
+            name='genero',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='filmes', to='filmestop.genero', verbose_name='Gênero'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='filme',
+            unique_together={('nome', 'genero', 'ano', 'sinopse', 'diretor', 'total_avaliacoes', 'nota_final')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:41
+
+import unicodedata
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def chave_do_genero(nome):
+    """
+    Cópia de `filmestop.models.chave_do_genero` em vigor nesta migração.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', nome).split()).casefold()
+
+
+def preencher_chaves(apps, schema_editor):
+    """
+    Preenche `Genero.chave` e une os gêneros que passam a ter a mesma chave (ex.: 'AÇÃO' e 'Ação'
+    criados no SQLite, onde UPPER só trata ASCII). Mantém o gênero com mais filmes.
+    """
+    Filme = apps.get_model('filmestop', 'Filme')
+    Genero = apps.get_model('filmestop', 'Genero')
+
+    grupos = defaultdict(list)
+    for genero in Genero.objects.order_by('-total_filmes', 'id'):
+        grupos[chave_do_genero(genero.nome)].append(genero)
+
+    for chave, (principal, *duplicados) in grupos.items():
+        if duplicados:
+            Filme.objects.filter(genero__in=duplicados).update(genero=principal)
+            principal.total_filmes += sum(genero.total_filmes for genero in duplicados)
+            Genero.objects.filter(pk__in=[genero.pk for genero in duplicados]).delete()
+        principal.chave = chave
+        principal.save(update_fields=['chave', 'total_filmes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0006_genero'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='genero',
+            name='genero_nome_unico',
+        ),
+        migrations.AddField(
+            model_name='genero',
+            name='chave',
+            field=models.CharField(editable=False, max_length=1000, null=True, verbose_name='Chave'),
+        ),
+        migrations.RunPython(preencher_chaves, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='genero',
+            name='chave',
+            field=models.CharField(editable=False, max_length=1000, unique=True, verbose_name='Chave'),
+        ),
+    ]
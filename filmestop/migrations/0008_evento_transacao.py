@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('filmestop', '0007_genero_chave'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='transacao',
+            field=models.BigIntegerField(default=0, verbose_name='Transação'),
+        ),
+        migrations.AddField(
+            model_name='offsetdeconsumidor',
+            name='ultima_transacao',
+            field=models.BigIntegerField(default=0, verbose_name='Última transação'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['transacao', 'id'], name='evento_transacao_idx'),
+        ),
+    ]
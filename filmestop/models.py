@@ -1,5 +1,10 @@
+import unicodedata
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .histograma import histograma_vazio
 
 class Usuario(models.Model):
     """
@@ -14,6 +19,58 @@ class Usuario(models.Model):
     celular = models.CharField(verbose_name="Celular", max_length=100, null=False, blank=False, unique=True)
     email = models.CharField(primary_key=True, verbose_name="Email", max_length=1000, null=False, blank=False, unique=True)
 
+    def __str__(self):
+        """
+        Retorna o email do usuário.
+        """
+        return self.email
+
+
+def chave_do_genero(nome):
+    """
+    Retorna a forma normalizada do nome de um gênero: Unicode NFKC, espaços colapsados e `casefold`.
+    É calculada em Python, então trata acentos (ex.: 'AÇÃO' e 'Ação') da mesma forma em qualquer banco.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', nome).split()).casefold()
+
+
+class Genero(models.Model):
+    """
+    Representa um gênero de filme.
+
+    Atributos:
+        id (SmallAutoField): Identificador inteiro compacto, referenciado pelos filmes.
+        nome (CharField): Nome do gênero, como exibido.
+        chave (CharField): Nome normalizado por `chave_do_genero`, único. Preenchido ao salvar.
+        total_filmes (IntegerField): Quantidade de filmes do gênero, mantida ao inserir e remover filmes.
+    """
+    id = models.SmallAutoField(primary_key=True)
+    nome = models.CharField(verbose_name="Nome", max_length=1000, null=False, blank=False)
+    chave = models.CharField(verbose_name="Chave", max_length=1000, unique=True, editable=False)
+    total_filmes = models.IntegerField(verbose_name="Total de filmes", default=0)
+
+    def clean(self):
+        """
+        Impede, nos formulários, nomes que colidem com outro gênero após a normalização.
+        """
+        if Genero.objects.filter(chave=chave_do_genero(self.nome)).exclude(pk=self.pk).exists():
+            raise ValidationError({'nome': 'Já existe um gênero com este nome.'})
+
+    def save(self, *args, **kwargs):
+        """
+        Atualiza a chave normalizada antes de salvar.
+        """
+        self.chave = chave_do_genero(self.nome)
+        if kwargs.get('update_fields') is not None and 'nome' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'chave'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        """
+        Retorna o nome do gênero.
+        """
+        return self.nome
+
 
 class Filme(models.Model):
     """
@@ -21,23 +78,25 @@ class Filme(models.Model):
 
     Atributos:
         nome (CharField): Nome do filme, chave primária.
-        genero (CharField): Gênero do filme.
+        genero (ForeignKey): Referência ao gênero do filme.
         ano (DateField): Ano de lançamento do filme.
         sinopse (CharField): Sinopse do filme.
         diretor (CharField): Nome do diretor do filme.
         total_avaliacoes (IntegerField): Número total de avaliações recebidas, default é 0.
         nota_final (FloatField): Nota final média do filme, deve estar entre 0 e 10.
+        histograma_notas (JSONField): Quantidade de notas em cada faixa de 0.0 a 10.0, em passos de 0.5.
 
     Meta:
         unique_together: Garante que a combinação dos campos nome, genero, ano, sinopse, diretor, total_avaliacoes e nota_final seja única.
     """
     nome = models.CharField(primary_key=True, verbose_name="Nome", max_length=1000, null=False, blank=False, unique=True)
-    genero = models.CharField(verbose_name="Gênero", max_length=1000, null=False, blank=False)
+    genero = models.ForeignKey(Genero, verbose_name="Gênero", on_delete=models.PROTECT, related_name='filmes')
     ano = models.DateField(verbose_name="Ano", null=False, blank=False)
     sinopse = models.CharField(verbose_name="Sinopse", max_length=3000, null=False, blank=False)
     diretor = models.CharField(verbose_name="Diretor", max_length=1000, null=False, blank=False)
     total_avaliacoes = models.IntegerField(verbose_name="Total de avaliações", default=0, blank=True)
     nota_final = models.FloatField(default=0, validators=[MinValueValidator(0), MaxValueValidator(10)], verbose_name="Nota final", null=False, blank=False)
+    histograma_notas = models.JSONField(verbose_name="Histograma de notas", default=histograma_vazio, blank=True)
 
     class Meta:
         unique_together = ('nome', 'genero', 'ano', 'sinopse', 'diretor', 'total_avaliacoes', 'nota_final')
@@ -60,6 +119,7 @@ class Aluguel(models.Model):
     
     Meta:
         unique_together: Garante que a combinação dos campos usuario e filme seja única.
+        indexes: Índice por data_de_locacao, usado pelo particionamento e pelo arquivamento de aluguéis antigos.
     """
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
     filme = models.ForeignKey(Filme, on_delete=models.CASCADE)
@@ -67,12 +127,17 @@ class Aluguel(models.Model):
 
     def __str__(self):
         """
-        Retorna uma string formatada com o nome do usuário e o nome do filme.
+        Retorna uma string formatada com o email do usuário e o nome do filme.
+
+        Usa as chaves estrangeiras (email e nome são as chaves primárias) para não consultar o banco.
         """
-        return f'{self.usuario.username} alugou {self.filme.nome}'
+        return f'{self.usuario_id} alugou {self.filme_id}'
 
     class Meta:
         unique_together = ('usuario', 'filme')
+        indexes = [
+            models.Index(fields=['data_de_locacao'], name='aluguel_data_locacao_idx'),
+        ]
 
 
 class Nota(models.Model):
@@ -93,3 +158,66 @@ class Nota(models.Model):
 
     class Meta:
         unique_together = ('usuario', 'filme', 'nota_atribuida_ao_filme')
+
+    def __str__(self):
+        """
+        Retorna uma string formatada com o email do usuário, a nota e o nome do filme.
+        """
+        return f'{self.usuario_id} deu nota {self.nota_atribuida_ao_filme} a {self.filme_id}'
+
+
+class Evento(models.Model):
+    """
+    Evento da outbox transacional, gravado na mesma transação que o aluguel ou a nota que o originou.
+
+    Atributos:
+        id (BigAutoField): Identificador sequencial, usado pelos consumidores para descartar duplicatas.
+        transacao (BigIntegerField): Identificador (xid) da transação que gravou o evento no PostgreSQL,
+            0 nos demais bancos. Junto com `id`, define a ordem de entrega e o offset dos consumidores.
+        tipo (CharField): Tipo do evento, ex.: aluguel_criado ou nota_criada.
+        payload (JSONField): Dados do registro que originou o evento.
+        criado_em (DateTimeField): Data e hora em que o evento foi gravado, definida automaticamente.
+
+    Meta:
+        indexes: Índice por (transacao, id), a ordem de leitura do relay.
+    """
+    ALUGUEL_CRIADO = 'aluguel_criado'
+    NOTA_CRIADA = 'nota_criada'
+
+    transacao = models.BigIntegerField(verbose_name="Transação", default=0)
+    tipo = models.CharField(verbose_name="Tipo", max_length=100, null=False, blank=False)
+    payload = models.JSONField(verbose_name="Payload", encoder=DjangoJSONEncoder)
+    criado_em = models.DateTimeField(verbose_name="Criado em", auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['transacao', 'id'], name='evento_transacao_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna o identificador e o tipo do evento.
+        """
+        return f'{self.id} {self.tipo}'
+
+
+class OffsetDeConsumidor(models.Model):
+    """
+    Último evento entregue com sucesso a cada consumidor da outbox.
+
+    Atributos:
+        consumidor (CharField): Nome do consumidor, chave primária.
+        ultima_transacao (BigIntegerField): Transação do último evento entregue, 0 se nenhum.
+        ultimo_evento (BigIntegerField): Identificador do último evento entregue, 0 se nenhum.
+        atualizado_em (DateTimeField): Data e hora da última atualização do offset.
+    """
+    consumidor = models.CharField(primary_key=True, verbose_name="Consumidor", max_length=200)
+    ultima_transacao = models.BigIntegerField(verbose_name="Última transação", default=0)
+    ultimo_evento = models.BigIntegerField(verbose_name="Último evento", default=0)
+    atualizado_em = models.DateTimeField(verbose_name="Atualizado em", auto_now=True)
+
+    def __str__(self):
+        """
+        Retorna o nome do consumidor e o seu offset.
+        """
+        return f'{self.consumidor}: {self.ultimo_evento}'
@@ -0,0 +1,85 @@
+"""
+Outbox transacional de aluguéis e notas.
+
+As views gravam um `Evento` na mesma transação do aluguel ou da nota. O comando
+`transmitir_eventos` lê os eventos em ordem, a partir do offset salvo para o consumidor,
+e os entrega em lotes a um destino. O offset só avança depois que o destino confirma o lote, então
+a entrega é "pelo menos uma vez": após uma falha o último lote pode ser reenviado, e os consumidores
+devem usar o `id` do evento para descartar duplicatas.
+
+No PostgreSQL cada evento guarda o xid da transação que o gravou, e o relay entrega em ordem de
+(xid, id) apenas eventos de transações já terminadas (xid abaixo de `pg_snapshot_xmin`). Assim o offset
+nunca passa por um evento de uma transação ainda aberta, sem relógios e sem travas na gravação.
+Uma transação longa em qualquer banco do servidor atrasa a entrega até terminar.
+
+Destinos são classes com o método `enviar(eventos)` e podem ser informados pelo caminho de
+importação (ex.: `filmestop.outbox.DestinoNDJSON`) ou por um dos apelidos de `DESTINOS`.
+"""
+
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .repositories.repositories import EventoRepository
+
+
+class DestinoNDJSON:
+    """
+    Acrescenta os eventos a um arquivo, um JSON por linha. Útil para testes locais e integrações simples.
+    """
+
+    def __init__(self, caminho='eventos.ndjson'):
+        self.caminho = caminho
+
+    def enviar(self, eventos):
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            for evento in eventos:
+                arquivo.write(json.dumps(evento, cls=DjangoJSONEncoder, ensure_ascii=False))
+                arquivo.write('\n')
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+
+class DestinoMemoria:
+    """
+    Guarda os eventos em uma lista compartilhada pela classe. Usado em testes.
+    """
+    eventos = []
+
+    def enviar(self, eventos):
+        DestinoMemoria.eventos.extend(eventos)
+
+
+DESTINOS = {
+    'ndjson': 'filmestop.outbox.DestinoNDJSON',
+    'memoria': 'filmestop.outbox.DestinoMemoria',
+}
+
+
+def carregar_destino(nome, caminho=None):
+    """
+    Instancia o destino pelo apelido ou pelo caminho de importação da classe.
+    """
+    classe = import_string(DESTINOS.get(nome, nome))
+    return classe(caminho) if caminho else classe()
+
+
+def transmitir(destino, consumidor, tamanho_lote=500):
+    """
+    Entrega ao destino, em lotes ordenados, os eventos ainda não entregues ao consumidor.
+    Retorna a quantidade de eventos entregues.
+    """
+    offset = EventoRepository.get_offset(consumidor)
+    entregues = 0
+
+    while True:
+        eventos = EventoRepository.get_eventos_apos(offset, tamanho_lote)
+        if not eventos:
+            return entregues
+
+        destino.enviar(eventos)
+        offset = eventos[-1]['transacao'], eventos[-1]['id']
+        EventoRepository.salvar_offset(consumidor, offset)
+        entregues += len(eventos)
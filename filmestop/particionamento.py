@@ -0,0 +1,203 @@
+"""
+Particionamento declarativo (PostgreSQL) da tabela de aluguéis por mês de locação.
+
+O particionamento é opcional e controlado por `settings.ALUGUEL_PARTICIONADO`. Em bancos que
+não suportam particionamento declarativo (ex.: SQLite) todas as funções se degradam para uma
+tabela comum, e o arquivamento passa a remover as linhas com um DELETE simples.
+
+Observação: no PostgreSQL, chaves primárias e restrições únicas de uma tabela particionada
+precisam incluir a chave de partição. Por isso, após a conversão, a chave primária passa a ser
+(id, data_de_locacao) e a unicidade de (usuario, filme) deixa de ser garantida pelo banco. Ela
+passa a depender de `AlugarFilmePorNomeView`, que verifica e cria o aluguel com a linha do usuário
+bloqueada (`select_for_update`); aluguéis gravados por outros caminhos não são verificados.
+
+A restrição única removida continua registrada no estado das migrações (`unique_together` de
+`Aluguel`). Em um banco convertido, uma migração que altere esse `unique_together` precisa ser
+aplicada com `--fake` (ou com `SeparateDatabaseAndState`), já que a restrição não existe no banco.
+
+Linhas de meses sem partição vão para a partição padrão (`<tabela>_padrao`). Como o PostgreSQL
+não permite criar a partição de um mês enquanto a padrão tiver linhas desse mês, `criar_particao`
+move essas linhas para a nova partição.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Aluguel, Filme, Usuario
+
+
+def particionamento_ativo():
+    """
+    Indica se o particionamento deve ser utilizado: precisa estar habilitado nas configurações
+    e o banco de dados precisa ser PostgreSQL.
+    """
+    return getattr(settings, 'ALUGUEL_PARTICIONADO', False) and connection.vendor == 'postgresql'
+
+
+def inicio_do_mes(dia):
+    """
+    Retorna o primeiro dia do mês da data informada.
+    """
+    return dia.replace(day=1)
+
+
+def somar_meses(mes, quantidade):
+    """
+    Soma (ou subtrai) uma quantidade de meses ao primeiro dia do mês informado.
+    """
+    indice = mes.year * 12 + (mes.month - 1) + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def meses_no_intervalo(inicio, fim):
+    """
+    Gera o primeiro dia de cada mês entre `inicio` e `fim` (inclusive).
+    """
+    mes = inicio_do_mes(inicio)
+    while mes <= fim:
+        yield mes
+        mes = somar_meses(mes, 1)
+
+
+def nome_da_particao(mes):
+    """
+    Nome da partição mensal correspondente ao mês informado, ex.: `filmestop_aluguel_p202410`.
+    """
+    return f'{Aluguel._meta.db_table}_p{mes:%Y%m}'
+
+
+def tabela_particionada(cursor):
+    """
+    Verifica no catálogo do PostgreSQL se a tabela de aluguéis já é uma tabela particionada.
+    """
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)",
+        [Aluguel._meta.db_table],
+    )
+    linha = cursor.fetchone()
+    return linha is not None and linha[0] == 'p'
+
+
+def particao_existe(cursor, mes):
+    """
+    Verifica se a partição mensal do mês informado existe.
+    """
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [nome_da_particao(mes)])
+    return cursor.fetchone()[0]
+
+
+def nome_da_particao_padrao():
+    """
+    Nome da partição padrão, que recebe as linhas de meses sem partição.
+    """
+    return f'{Aluguel._meta.db_table}_padrao'
+
+
+def criar_particao(cursor, mes):
+    """
+    Cria, se ainda não existir, a partição que cobre o mês informado. As linhas do mês que estejam
+    na partição padrão (ex.: após uma execução perdida do `criar_particoes_aluguel`) são movidas
+    para a nova partição. Deve ser executada dentro de uma transação.
+    Retorna a quantidade de linhas movidas.
+    """
+    if particao_existe(cursor, mes):
+        return 0
+
+    qn = connection.ops.quote_name
+    tabela = Aluguel._meta.db_table
+    padrao = nome_da_particao_padrao()
+    temporaria = f'{tabela}_movidos'
+    intervalo = [mes, somar_meses(mes, 1)]
+
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [padrao])
+    possui_padrao = cursor.fetchone()[0]
+    movidas = 0
+    if possui_padrao:
+        cursor.execute(f"CREATE TEMPORARY TABLE {qn(temporaria)} (LIKE {qn(tabela)})")
+        cursor.execute(
+            f"WITH movidas AS (DELETE FROM {qn(padrao)} "
+            f"WHERE data_de_locacao >= %s AND data_de_locacao < %s RETURNING *) "
+            f"INSERT INTO {qn(temporaria)} SELECT * FROM movidas",
+            intervalo,
+        )
+        movidas = cursor.rowcount
+
+    cursor.execute(
+        f"CREATE TABLE {qn(nome_da_particao(mes))} "
+        f"PARTITION OF {qn(tabela)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        intervalo,
+    )
+
+    if possui_padrao:
+        if movidas:
+            cursor.execute(f"INSERT INTO {qn(tabela)} SELECT * FROM {qn(temporaria)}")
+        cursor.execute(f"DROP TABLE {qn(temporaria)}")
+    return movidas
+
+
+def converter_para_particionada(cursor):
+    """
+    Converte a tabela de aluguéis em uma tabela particionada por intervalo de `data_de_locacao`.
+
+    A tabela original é renomeada, uma nova tabela particionada com as mesmas colunas é criada,
+    as partições mensais cobrindo os dados existentes são criadas e as linhas são copiadas.
+    Deve ser executada dentro de uma transação.
+    """
+    qn = connection.ops.quote_name
+    tabela = Aluguel._meta.db_table
+    legado = f'{tabela}_legado'
+
+    cursor.execute(f"ALTER TABLE {qn(tabela)} RENAME TO {qn(legado)}")
+    cursor.execute(
+        f"CREATE TABLE {qn(tabela)} (LIKE {qn(legado)} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+        f"PARTITION BY RANGE (data_de_locacao)"
+    )
+    cursor.execute(f"ALTER TABLE {qn(tabela)} ADD PRIMARY KEY (id, data_de_locacao)")
+    cursor.execute(f"CREATE INDEX ON {qn(tabela)} (usuario_id)")
+    cursor.execute(f"CREATE INDEX ON {qn(tabela)} (filme_id)")
+    cursor.execute(
+        f"ALTER TABLE {qn(tabela)} ADD FOREIGN KEY (usuario_id) "
+        f"REFERENCES {qn(Usuario._meta.db_table)} (email) DEFERRABLE INITIALLY DEFERRED"
+    )
+    cursor.execute(
+        f"ALTER TABLE {qn(tabela)} ADD FOREIGN KEY (filme_id) "
+        f"REFERENCES {qn(Filme._meta.db_table)} (nome) DEFERRABLE INITIALLY DEFERRED"
+    )
+    # A partição padrão recebe linhas fora dos meses já criados, evitando falhas de inserção.
+    cursor.execute(f"CREATE TABLE {qn(nome_da_particao_padrao())} PARTITION OF {qn(tabela)} DEFAULT")
+
+    cursor.execute(f"SELECT MIN(data_de_locacao), MAX(data_de_locacao) FROM {qn(legado)}")
+    primeira, ultima = cursor.fetchone()
+    if primeira is not None:
+        for mes in meses_no_intervalo(primeira, ultima):
+            criar_particao(cursor, mes)
+
+    cursor.execute(f"INSERT INTO {qn(tabela)} SELECT * FROM {qn(legado)}")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {qn(tabela)}",
+        [tabela],
+    )
+    # Verifica agora as chaves estrangeiras adiadas: a tabela antiga não pode ser removida enquanto a
+    # transação tiver verificações pendentes sobre ela (ex.: aluguéis gravados antes da conversão).
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    cursor.execute(f"DROP TABLE {qn(legado)}")
+
+    # Os índices declarados em `Aluguel.Meta.indexes` são recriados com o mesmo nome (só possível após
+    # remover a tabela antiga), para que migrações futuras que os alterem ou removam continuem válidas.
+    for indice in Aluguel._meta.indexes:
+        colunas = ', '.join(qn(Aluguel._meta.get_field(campo).column) for campo in indice.fields)
+        cursor.execute(f"CREATE INDEX {qn(indice.name)} ON {qn(tabela)} ({colunas})")
+
+
+def remover_particao(cursor, mes):
+    """
+    Desanexa e remove a partição do mês informado. Deve ser chamada somente após o conteúdo
+    da partição ter sido arquivado.
+    """
+    qn = connection.ops.quote_name
+    particao = nome_da_particao(mes)
+    cursor.execute(f"ALTER TABLE {qn(Aluguel._meta.db_table)} DETACH PARTITION {qn(particao)}")
+    cursor.execute(f"DROP TABLE {qn(particao)}")
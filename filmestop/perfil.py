@@ -0,0 +1,228 @@
+"""
+Captura de perfis de requisições em produção.
+
+O `PerfilMiddleware` só entra na lista de middleware quando `PERFIL_HABILITADO=True`. Com ele ativo:
+
+- uma fração das requisições (`PERFIL_TAXA_AMOSTRAGEM`) é sempre gravada;
+- qualquer requisição mais lenta que `PERFIL_LIMITE_MS` também é gravada.
+
+Há dois modos (`PERFIL_MODO`):
+
+- `amostragem` (padrão): uma única thread de fundo lê a pilha das requisições em andamento a cada
+  `PERFIL_INTERVALO_MS` (via `sys._current_frames()`). O custo não depende do número de chamadas
+  Python, e como todas as requisições são acompanhadas, as lentas chegam ao disco com suas pilhas.
+- `cprofile`: as requisições sorteadas são executadas sob `cProfile`, com tempos exatos por função.
+  Requisições lentas não sorteadas são gravadas apenas com a duração e o SQL.
+
+Cada perfil inclui as consultas SQL executadas na requisição (com o tempo de cada uma) e é gravado
+como JSON em `PERFIL_DIR/<nome da URL>/`, mantendo no máximo `PERFIL_MAX_ARQUIVOS` por URL. O comando
+`relatorio_perfis` agrega os arquivos em um ranking dos caminhos mais custosos.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+def rotulo_do_codigo(arquivo, linha, nome):
+    """
+    Rótulo de uma função, no mesmo formato para os dois modos: `arquivo:linha(nome)`.
+    """
+    return f'{arquivo}:{linha}({nome})'
+
+
+class Amostrador:
+    """
+    Thread única que registra periodicamente a pilha de cada requisição em andamento.
+    """
+
+    profundidade_maxima = 64
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.ativos = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def iniciar(self, thread_id):
+        """
+        Passa a amostrar a thread informada e retorna o contador de pilhas dela.
+        """
+        pilhas = Counter()
+        with self.lock:
+            self.ativos[thread_id] = pilhas
+            # A thread é criada na primeira requisição, já dentro do worker (depois do fork do gunicorn).
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.executar, name='perfil-amostrador', daemon=True)
+                self.thread.start()
+        return pilhas
+
+    def parar(self, thread_id):
+        """
+        Deixa de amostrar a thread informada; depois do retorno, o contador dela não muda mais.
+        """
+        with self.lock:
+            self.ativos.pop(thread_id, None)
+
+    def executar(self):
+        while True:
+            time.sleep(self.intervalo)
+            with self.lock:
+                ativos = list(self.ativos.items())
+            if not ativos:
+                continue
+
+            frames = sys._current_frames()
+            amostras = [(thread_id, pilhas, self.pilha(frames[thread_id])) for thread_id, pilhas in ativos if thread_id in frames]
+            del frames
+            # Os contadores só mudam sob a trava e enquanto a thread está ativa: depois de `parar`,
+            # a requisição pode ler as suas pilhas sem concorrência.
+            with self.lock:
+                for thread_id, pilhas, pilha in amostras:
+                    if self.ativos.get(thread_id) is pilhas:
+                        pilhas[pilha] += 1
+
+    def pilha(self, frame):
+        rotulos = []
+        while frame is not None and len(rotulos) < self.profundidade_maxima:
+            codigo = frame.f_code
+            rotulos.append(rotulo_do_codigo(codigo.co_filename, codigo.co_firstlineno, codigo.co_name))
+            frame = frame.f_back
+        return tuple(reversed(rotulos))
+
+
+class RegistroDeConsultas:
+    """
+    `execute_wrapper` que guarda o SQL (sem parâmetros) e a duração de cada consulta da requisição.
+    """
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append({'sql': sql, 'duracao_ms': (time.perf_counter() - inicio) * 1000})
+
+
+def funcoes_das_pilhas(pilhas, intervalo_ms):
+    """
+    Converte as pilhas amostradas em tempo próprio e inclusivo (ms estimados) por função.
+    """
+    funcoes = {}
+    for pilha, amostras in pilhas.items():
+        tempo = amostras * intervalo_ms
+        for rotulo in set(pilha):
+            funcoes.setdefault(rotulo, {'proprio_ms': 0.0, 'inclusivo_ms': 0.0})['inclusivo_ms'] += tempo
+        funcoes[pilha[-1]]['proprio_ms'] += tempo
+    return funcoes
+
+
+def funcoes_do_cprofile(perfilador):
+    """
+    Converte as estatísticas do cProfile em tempo próprio e inclusivo (ms) por função.
+    """
+    funcoes = {}
+    for (arquivo, linha, nome), (_, chamadas, proprio, inclusivo, _) in pstats.Stats(perfilador).stats.items():
+        funcoes[rotulo_do_codigo(arquivo, linha, nome)] = {
+            'chamadas': chamadas,
+            'proprio_ms': proprio * 1000,
+            'inclusivo_ms': inclusivo * 1000,
+        }
+    return funcoes
+
+
+def gravar_perfil(diretorio, dados, max_arquivos):
+    """
+    Grava o perfil em `diretorio/<url_name>/` e remove os arquivos mais antigos além de `max_arquivos`.
+    """
+    destino = os.path.join(diretorio, dados['url_name'])
+    os.makedirs(destino, exist_ok=True)
+
+    nome = f"{timezone.now():%Y%m%dT%H%M%S%f}-{dados['duracao_ms']:.0f}ms.json"
+    with open(os.path.join(destino, nome), 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+
+    arquivos = sorted(arquivo for arquivo in os.listdir(destino) if arquivo.endswith('.json'))
+    for antigo in arquivos[:-max_arquivos]:
+        os.remove(os.path.join(destino, antigo))
+
+
+class PerfilMiddleware:
+    """
+    Middleware que grava o perfil de uma fração das requisições e de todas as requisições lentas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.modo = settings.PERFIL_MODO
+        self.taxa = settings.PERFIL_TAXA_AMOSTRAGEM
+        self.limite = settings.PERFIL_LIMITE_MS / 1000
+        self.intervalo_ms = settings.PERFIL_INTERVALO_MS
+        self.diretorio = settings.PERFIL_DIR
+        self.max_arquivos = settings.PERFIL_MAX_ARQUIVOS
+        self.amostrador = Amostrador(self.intervalo_ms / 1000) if self.modo == 'amostragem' else None
+
+    def __call__(self, request):
+        sorteada = random.random() < self.taxa
+        perfilador = cProfile.Profile() if sorteada and self.modo == 'cprofile' else None
+        registro = RegistroDeConsultas()
+        thread_id = threading.get_ident()
+        pilhas = self.amostrador.iniciar(thread_id) if self.amostrador else None
+
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as contexto:
+                for conexao in connections.all():
+                    contexto.enter_context(conexao.execute_wrapper(registro))
+                if perfilador:
+                    perfilador.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if perfilador:
+                        perfilador.disable()
+        finally:
+            if pilhas is not None:
+                self.amostrador.parar(thread_id)
+        duracao = time.perf_counter() - inicio
+
+        if sorteada or duracao >= self.limite:
+            try:
+                if perfilador:
+                    funcoes = funcoes_do_cprofile(perfilador)
+                elif pilhas is not None:
+                    funcoes = funcoes_das_pilhas(pilhas, self.intervalo_ms)
+                else:
+                    funcoes = {}
+
+                dados = {
+                    'url_name': getattr(request.resolver_match, 'url_name', None) or 'sem_nome',
+                    'metodo': request.method,
+                    'caminho': request.path,
+                    'status': response.status_code,
+                    'motivo': 'amostra' if sorteada else 'lenta',
+                    'modo': 'cprofile' if perfilador else self.modo,
+                    'duracao_ms': duracao * 1000,
+                    'consultas': registro.consultas,
+                    'funcoes': funcoes,
+                    'pilhas': {';'.join(pilha): amostras for pilha, amostras in (pilhas or {}).items()},
+                }
+                gravar_perfil(self.diretorio, dados, self.max_arquivos)
+            except Exception:
+                # Uma falha ao montar ou gravar o perfil (ex.: disco cheio) não deve afetar a resposta.
+                pass
+        return response
@@ -1,15 +1,185 @@
-from filmestop.models import Filme,Nota,Aluguel,Usuario
+import hashlib
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Avg, BooleanField, Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Upper
+from filmestop.models import Filme,Genero,Nota,Aluguel,Usuario,Evento,OffsetDeConsumidor,chave_do_genero
+from filmestop.histograma import histograma_vazio, histogramas_por_filme
 
 class FilmeRepository:
+    # Campo da resposta -> coluna lida do banco. O gênero é retornado pelo nome.
+    COLUNAS = {
+        'nome': 'nome',
+        'genero': 'genero__nome',
+        'ano': 'ano',
+        'sinopse': 'sinopse',
+        'diretor': 'diretor',
+        'total_avaliacoes': 'total_avaliacoes',
+        'nota_final': 'nota_final',
+    }
+    CAMPOS = tuple(COLUNAS)
+
     @staticmethod
-    def get_filme_por_nome(nome):
-        return Filme.objects.filter(nome__iexact=nome).values(
-            'nome', 'genero', 'ano', 'sinopse', 'diretor', 'total_avaliacoes', 'nota_final'
-        )
+    def _projetar(filmes, campos):
+        """
+        Retorna os filmes como dicionários com os campos solicitados. Equivale a `values(*campos)`,
+        mas permite que o campo `genero` traga o nome do gênero relacionado.
+        """
+        colunas = [FilmeRepository.COLUNAS[campo] for campo in campos]
+        return [dict(zip(campos, linha)) for linha in filmes.values_list(*colunas)]
+
+    @staticmethod
+    def get_filme_por_nome(nome, campos=CAMPOS):
+        return FilmeRepository._projetar(Filme.objects.filter(nome__iexact=nome), campos)
     
     @staticmethod
-    def get_filme_por_genero(genero):
-        return Filme.objects.filter(genero__iexact=genero).values('nome','genero', 'ano', 'sinopse', 'diretor','total_avaliacoes','nota_final')
+    def get_filme_por_genero(genero, campos=CAMPOS):
+        return FilmeRepository._projetar(Filme.objects.filter(genero__chave=chave_do_genero(genero)), campos)
+
+    @staticmethod
+    def chave_de_cache(prefixo, valor):
+        return f'{prefixo}:' + hashlib.md5(valor.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def invalidar_cache(nomes):
+        """
+        Remove do cache os filmes com as chaves primárias (nomes) informadas. `nomes` pode ser um
+        queryset `values_list`, avaliado apenas com o cache habilitado. A remoção ocorre após o COMMIT,
+        para que uma leitura concorrente não grave de volta a versão anterior ao fim da transação.
+        """
+        if settings.FILME_CACHE_TIMEOUT:
+            chaves = [FilmeRepository.chave_de_cache('filme', nome) for nome in nomes]
+            transaction.on_commit(lambda: caches[settings.FILME_CACHE_ALIAS].delete_many(chaves))
+
+    @staticmethod
+    def _ler_cache(cache, nomes):
+        """
+        Lê do cache, com duas leituras em lote, os filmes dos nomes solicitados: primeiro o nome
+        solicitado -> chave primária do filme, depois a chave primária -> filme.
+        """
+        por_chave = {FilmeRepository.chave_de_cache('filme:nome', nome): nome for nome in nomes}
+        chaves_dos_filmes = {
+            por_chave[chave]: FilmeRepository.chave_de_cache('filme', pk)
+            for chave, pk in cache.get_many(por_chave).items()
+        }
+        filmes = cache.get_many(set(chaves_dos_filmes.values()))
+        return {nome: filmes[chave] for nome, chave in chaves_dos_filmes.items() if chave in filmes}
+
+    @staticmethod
+    def _gravar_cache(cache, encontrados):
+        valores = {}
+        for nome, filme in encontrados.items():
+            valores[FilmeRepository.chave_de_cache('filme:nome', nome)] = filme['nome']
+            valores[FilmeRepository.chave_de_cache('filme', filme['nome'])] = filme
+        cache.set_many(valores, settings.FILME_CACHE_TIMEOUT)
+
+    @staticmethod
+    def get_filmes_por_nomes(nomes, campos=CAMPOS):
+        """
+        Busca vários filmes pelo nome (sem diferenciar maiúsculas e minúsculas) com uma única consulta
+        `UPPER(nome) IN (UPPER(...), ...)`, atendida pelo índice em UPPER(nome). Retorna um dicionário
+        nome solicitado -> filme (com os campos solicitados) ou None, se o filme não existir.
+
+        A comparação é feita apenas pelo banco, como em `get_filme_por_nome`: cada linha retornada
+        traz uma coluna booleana por nome solicitado indicando se o nome corresponde ao filme.
+
+        Com `FILME_CACHE_TIMEOUT` configurado, os filmes são lidos primeiro do cache, em lote, pelo nome
+        exatamente como foi solicitado, e apenas os ausentes são buscados no banco e gravados de volta
+        com `set_many`. O cache guarda todos os campos, para atender qualquer seleção de `campos`, e
+        cada filme é guardado uma única vez pela chave primária, removida por `invalidar_cache`.
+        """
+        cache = caches[settings.FILME_CACHE_ALIAS] if settings.FILME_CACHE_TIMEOUT else None
+        distintos = list(dict.fromkeys(nomes))
+
+        encontrados = FilmeRepository._ler_cache(cache, distintos) if cache else {}
+
+        faltantes = [nome for nome in distintos if nome not in encontrados]
+        if faltantes:
+            colunas = FilmeRepository.CAMPOS if cache else tuple(campos)
+            filmes = (
+                Filme.objects.alias(nome_maiusculo=Upper('nome'))
+                .filter(nome_maiusculo__in=[Upper(Value(nome)) for nome in faltantes])
+                .annotate(**{
+                    f'solicitado_{indice}': ExpressionWrapper(Q(nome_maiusculo=Upper(Value(nome))), output_field=BooleanField())
+                    for indice, nome in enumerate(faltantes)
+                })
+            )
+            marcadores = [f'solicitado_{indice}' for indice in range(len(faltantes))]
+            novos = {}
+            for linha in filmes.values_list(*[FilmeRepository.COLUNAS[campo] for campo in colunas], *marcadores):
+                filme = dict(zip(colunas, linha))
+                for nome, corresponde in zip(faltantes, linha[len(colunas):]):
+                    if corresponde:
+                        novos[nome] = filme
+            encontrados.update(novos)
+            if cache and novos:
+                FilmeRepository._gravar_cache(cache, novos)
+
+        resultado = {}
+        for nome in nomes:
+            filme = encontrados.get(nome)
+            resultado[nome] = {campo: filme[campo] for campo in campos} if filme else None
+        return resultado
+
+    @staticmethod
+    def _travar(filmes):
+        """
+        Bloqueia as linhas dos filmes (em ordem de chave primária, evitando deadlocks) e retorna as
+        chaves primárias. Com as linhas bloqueadas, `DarNotaAoFilmeAlugadoView`, que também bloqueia o
+        filme, não grava notas entre a leitura das notas e a gravação dos valores recalculados.
+        Deve ser chamado dentro de uma transação.
+        """
+        return list(filmes.select_for_update().order_by('pk').values_list('pk', flat=True))
+
+    @staticmethod
+    def recalcular_avaliacoes(filmes):
+        """
+        Recalcula total_avaliacoes e nota_final dos filmes do queryset em um único UPDATE.
+        """
+        notas = Nota.objects.filter(filme=OuterRef('pk')).order_by().values('filme')
+        total = notas.annotate(total=Count('id')).values('total')
+        media = notas.annotate(media=Avg('nota_atribuida_ao_filme')).values('media')
+        with transaction.atomic():
+            pks = FilmeRepository._travar(filmes)
+            # `update()` não dispara sinais: o cache dos filmes é invalidado aqui.
+            FilmeRepository.invalidar_cache(pks)
+            return Filme.objects.filter(pk__in=pks).update(
+                total_avaliacoes=Coalesce(Subquery(total, output_field=IntegerField()), Value(0)),
+                nota_final=Coalesce(Subquery(media, output_field=FloatField()), Value(0.0)),
+            )
+
+    @staticmethod
+    def get_estatisticas(nome):
+        return Filme.objects.filter(nome__iexact=nome).values('nome', 'total_avaliacoes', 'nota_final', 'histograma_notas').first()
+
+    @staticmethod
+    def reconstruir_histogramas(filmes=None, tamanho_lote=1000):
+        """
+        Recalcula os histogramas de notas a partir da tabela de notas, com uma consulta agrupada por
+        filme e faixa e atualizações em lote. Sem `filmes`, recalcula todos os filmes.
+        As linhas dos filmes ficam bloqueadas durante o recálculo, então avaliações desses filmes
+        aguardam o fim da transação.
+        """
+        if filmes is None:
+            filmes = Filme.objects.all()
+            notas = Nota.objects.all()
+        else:
+            notas = Nota.objects.filter(filme__in=filmes.values('pk'))
+
+        with transaction.atomic():
+            pks = FilmeRepository._travar(filmes)
+            FilmeRepository.invalidar_cache(pks)
+            histogramas = histogramas_por_filme(notas)
+            filmes.update(histograma_notas=histograma_vazio())
+            Filme.objects.bulk_update(
+                [Filme(nome=nome, histograma_notas=histograma) for nome, histograma in histogramas.items()],
+                ['histograma_notas'],
+                batch_size=tamanho_lote,
+            )
+        return len(histogramas)
 
  
 class NotaRepository:
@@ -24,13 +194,121 @@ class NotaRepository:
 
     
 class AluguelRepository:
+    # Campo da resposta de filmes alugados -> expressão correspondente no banco.
+    # Campos com o mesmo nome da coluna são selecionados diretamente (None).
+    COLUNAS_FILMES_ALUGADOS = {
+        'id': None,
+        'nome_filme': F('filme_id'),
+        'genero_filme': F('filme__genero__nome'),
+        'lancamento_filme': F('filme__ano'),
+        'diretor_filme': F('filme__diretor'),
+        'sinopse_filme': F('filme__sinopse'),
+        'email_usuario': F('usuario_id'),
+        'nota_do_filme': Subquery(
+            Nota.objects.filter(filme=OuterRef('filme'), usuario=OuterRef('usuario')).values('nota_atribuida_ao_filme')[:1]
+        ),
+        'data_de_locacao': None,
+    }
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _projecao_filmes_alugados(campos):
+        colunas = [campo for campo in campos if AluguelRepository.COLUNAS_FILMES_ALUGADOS[campo] is None]
+        expressoes = {campo: AluguelRepository.COLUNAS_FILMES_ALUGADOS[campo] for campo in campos if campo not in colunas}
+        return colunas, expressoes
 
     @staticmethod
-    def get_filmes_alugados(usuario):
-        return Aluguel.objects.filter(usuario=usuario).select_related('filme','usuario')
+    def get_filmes_alugados_campos(usuario, campos=tuple(COLUNAS_FILMES_ALUGADOS)):
+        """
+        Retorna os aluguéis do usuário como dicionários contendo apenas os campos solicitados.
+        O JOIN com filmes e a subconsulta da nota só entram na consulta quando algum campo os utiliza.
+        """
+        colunas, expressoes = AluguelRepository._projecao_filmes_alugados(campos)
+        return Aluguel.objects.filter(usuario=usuario).values(*colunas, **expressoes)
    
 class UsuarioRepository:
 
     @staticmethod
     def get_usuario_by_email(email):
         return Usuario.objects.filter(email__iexact=email)
+
+
+class GeneroRepository:
+
+    @staticmethod
+    def get_ou_criar(nome):
+        """
+        Retorna o gênero com o nome informado, comparando pela chave normalizada (`chave_do_genero`),
+        criando-o se não existir.
+        """
+        nome = nome.strip()
+        return Genero.objects.get_or_create(chave=chave_do_genero(nome), defaults={'nome': nome})[0]
+
+    @staticmethod
+    def get_generos_com_filmes():
+        return Genero.objects.filter(total_filmes__gt=0).order_by('nome').values('nome', 'total_filmes')
+
+    @staticmethod
+    def recalcular_totais():
+        """
+        Recalcula o total de filmes de todos os gêneros em um único UPDATE.
+        """
+        total = Filme.objects.filter(genero=OuterRef('pk')).order_by().values('genero').annotate(total=Count('pk')).values('total')
+        return Genero.objects.update(total_filmes=Coalesce(Subquery(total, output_field=IntegerField()), Value(0)))
+
+
+class EventoRepository:
+    # xid da transação atual e limite de visibilidade do PostgreSQL: toda transação com xid menor que
+    # `pg_snapshot_xmin` já terminou, então nenhum evento novo pode surgir abaixo desse limite.
+    XID_ATUAL = 'pg_current_xact_id()::text::bigint'
+    XMIN_VISIVEL = 'pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+
+    @staticmethod
+    def registrar(tipo, payload):
+        """
+        Grava um evento na outbox. Deve ser chamado dentro da transação que gravou o registro de origem.
+        No PostgreSQL o evento guarda o xid da transação, usado pelo relay como limite de visibilidade.
+        """
+        transacao = RawSQL(EventoRepository.XID_ATUAL, []) if connection.vendor == 'postgresql' else 0
+        return Evento.objects.create(tipo=tipo, payload=payload, transacao=transacao)
+
+    @staticmethod
+    def get_eventos_apos(offset, limite):
+        """
+        Retorna, em ordem de (transacao, id), os eventos posteriores ao offset `(transacao, id)`.
+
+        No PostgreSQL só são retornados eventos de transações com xid abaixo de `pg_snapshot_xmin`,
+        ou seja, de transações já terminadas. Como qualquer evento ainda não visível pertence a uma
+        transação de xid maior ou igual a esse limite, o offset nunca passa por um evento que ainda
+        vai aparecer, sem relógios e sem travas na gravação. No SQLite as escritas são serializadas
+        pelo próprio banco e a ordem é a do `id`.
+        """
+        transacao, ultimo_evento = offset
+        eventos = Evento.objects.filter(Q(transacao__gt=transacao) | Q(transacao=transacao, id__gt=ultimo_evento))
+        if connection.vendor == 'postgresql':
+            eventos = eventos.filter(transacao__lt=RawSQL(EventoRepository.XMIN_VISIVEL, []))
+        return list(eventos.order_by('transacao', 'id').values('id', 'transacao', 'tipo', 'payload', 'criado_em')[:limite])
+
+    @staticmethod
+    def get_offset(consumidor):
+        offset = OffsetDeConsumidor.objects.get_or_create(consumidor=consumidor)[0]
+        return offset.ultima_transacao, offset.ultimo_evento
+
+    @staticmethod
+    def salvar_offset(consumidor, offset):
+        transacao, ultimo_evento = offset
+        OffsetDeConsumidor.objects.update_or_create(
+            consumidor=consumidor,
+            defaults={'ultima_transacao': transacao, 'ultimo_evento': ultimo_evento},
+        )
+
+    @staticmethod
+    def remover_eventos_entregues():
+        """
+        Remove os eventos já entregues a todos os consumidores registrados.
+        """
+        offsets = OffsetDeConsumidor.objects.values_list('ultima_transacao', 'ultimo_evento')
+        if not offsets:
+            return 0
+        transacao, ultimo_evento = min(offsets)
+        return Evento.objects.filter(Q(transacao__lt=transacao) | Q(transacao=transacao, id__lte=ultimo_evento)).delete()[0]
@@ -0,0 +1,60 @@
+"""
+Sinais que mantêm `Genero.total_filmes` atualizado ao inserir, alterar o gênero ou remover filmes,
+e que removem do cache por filme (busca em lote por nome) os filmes alterados ou removidos e os
+filmes de um gênero renomeado. Os métodos de `FilmeRepository` que gravam com `update()` ou
+`bulk_update()` invalidam o cache por conta própria.
+
+Os contadores são ajustados com UPDATE ... SET total_filmes = total_filmes ± 1, sem ler nem
+contar a tabela de filmes. Operações em lote que não disparam sinais (`bulk_create`, `update`)
+devem ser seguidas de `GeneroRepository.recalcular_totais()`.
+"""
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Filme, Genero
+from .repositories.repositories import FilmeRepository
+
+
+def ajustar_total(genero_id, quantidade):
+    Genero.objects.filter(pk=genero_id).update(total_filmes=F('total_filmes') + quantidade)
+
+
+@receiver(pre_save, sender=Filme)
+def guardar_genero_anterior(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'genero' not in update_fields):
+        return
+    instance._genero_anterior = Filme.objects.filter(pk=instance.pk).values_list('genero_id', flat=True).first()
+
+
+@receiver(post_save, sender=Filme)
+def atualizar_total_ao_salvar(sender, instance, created, **kwargs):
+    if created:
+        ajustar_total(instance.genero_id, 1)
+        return
+
+    genero_anterior = instance.__dict__.pop('_genero_anterior', instance.genero_id)
+    if genero_anterior != instance.genero_id:
+        if genero_anterior is not None:
+            ajustar_total(genero_anterior, -1)
+        ajustar_total(instance.genero_id, 1)
+
+
+@receiver(post_delete, sender=Filme)
+def atualizar_total_ao_remover(sender, instance, **kwargs):
+    ajustar_total(instance.genero_id, -1)
+
+
+@receiver(post_save, sender=Filme)
+@receiver(post_delete, sender=Filme)
+def invalidar_cache_do_filme(sender, instance, **kwargs):
+    FilmeRepository.invalidar_cache([instance.pk])
+
+
+@receiver(post_save, sender=Genero)
+def invalidar_cache_dos_filmes_do_genero(sender, instance, created, update_fields=None, **kwargs):
+    # O cache guarda o nome do gênero de cada filme.
+    if created or (update_fields is not None and 'nome' not in update_fields):
+        return
+    FilmeRepository.invalidar_cache(instance.filmes.values_list('pk', flat=True))
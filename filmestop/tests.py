@@ -1,8 +1,29 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.conf import settings
+from django.core.cache import caches
 from django.urls import reverse
-from .models import Filme, Usuario
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from unittest import mock, skipUnless
+from . import outbox, particionamento
+from .checks import verificar_cache_de_filmes
+from .models import Filme, Genero, Usuario, Aluguel, Nota, Evento, OffsetDeConsumidor
+from .histograma import histogramas_por_filme
+from .outbox import DestinoMemoria
+from .perfil import Amostrador
+from .repositories.repositories import EventoRepository, FilmeRepository, GeneroRepository
 import json
-from datetime import datetime
+import gzip
+import sys
+import os
+import tempfile
+import threading
+from io import StringIO
+from datetime import datetime, date
+from setup.cache import cache_da_url
 
 class FilmePorGeneroViewTest(TestCase):
     """
@@ -18,8 +39,8 @@ class FilmePorGeneroViewTest(TestCase):
         """
         Configura o ambiente de teste com filmes de diferentes gêneros.
         """
-        self.filme1 = Filme.objects.create(nome='Filme A', genero='Ação', ano=datetime(2022, 3, 21), diretor='Diretor A', sinopse='Sinopse A')
-        self.filme2 = Filme.objects.create(nome='Filme B', genero='Comédia', ano=datetime(2021, 8, 11), diretor='Diretor B', sinopse='Sinopse B')
+        self.filme1 = Filme.objects.create(nome='Filme A', genero=GeneroRepository.get_ou_criar('Ação'), ano=datetime(2022, 3, 21), diretor='Diretor A', sinopse='Sinopse A')
+        self.filme2 = Filme.objects.create(nome='Filme B', genero=GeneroRepository.get_ou_criar('Comédia'), ano=datetime(2021, 8, 11), diretor='Diretor B', sinopse='Sinopse B')
 
     def test_get_filme_por_genero(self):
         """
@@ -58,7 +79,7 @@ class FilmePorNomeViewTest(TestCase):
         """
         Configura o ambiente de teste com um filme.
         """
-        self.filme = Filme.objects.create(nome='Filme C', genero='Drama', ano=datetime(2020, 3, 21), diretor='Diretor C', sinopse='Sinopse C')
+        self.filme = Filme.objects.create(nome='Filme C', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2020, 3, 21), diretor='Diretor C', sinopse='Sinopse C')
 
     def test_get_filme_por_nome(self):
         """
@@ -98,7 +119,7 @@ class AlugarFilmePorNomeViewTest(TestCase):
         Configura o ambiente de teste com um usuário e um filme.
         """
         self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste')
-        self.filme = Filme.objects.create(nome='Filme X', genero='Aventura', ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
 
     def test_alugar_filme_sucesso(self):
         """
@@ -152,7 +173,7 @@ class DarNotaAoFilmeAlugadoViewTest(TestCase):
         Configura o ambiente de teste com um usuário e um filme.
         """
         self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste')
-        self.filme = Filme.objects.create(nome='Filme X', genero='Aventura', ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
 
     def test_dar_nota_ao_filme_sucesso(self):
         """
@@ -230,7 +251,7 @@ class VerFilmesAlugadosViewTest(TestCase):
         Configura o ambiente de teste com um usuário e um filme.
         """
         self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
-        self.filme = Filme.objects.create(nome='Filme X', genero='Aventura', ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
 
     def test_get_lista_filmes_alugados_com_sucesso(self):
         """
@@ -254,3 +275,868 @@ class VerFilmesAlugadosViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
         data = json.loads(response.content)
         self.assertEqual(data['mensagem'], 'Usuário não encontrado')
+
+
+class ArquivarAlugueisCommandTest(TestCase):
+    """
+    Testes para os comandos de particionamento e arquivamento de aluguéis.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um aluguel antigo e um aluguel recente.
+        test_criar_particoes_sem_suporte: Testa que o comando de partições não altera a tabela fora do PostgreSQL.
+        test_arquivar_alugueis_antigos: Testa que apenas os aluguéis antigos são arquivados e removidos do banco.
+        test_arquivar_mes_ja_arquivado: Testa que um novo arquivamento do mesmo mês não sobrescreve o arquivo anterior.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um aluguel antigo e um aluguel recente.
+        """
+        self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        self.filme_antigo = Filme.objects.create(nome='Filme Antigo', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2000, 1, 1), diretor='Diretor A', sinopse='Sinopse A')
+        self.filme_recente = Filme.objects.create(nome='Filme Recente', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2022, 1, 1), diretor='Diretor B', sinopse='Sinopse B')
+        antigo = Aluguel.objects.create(usuario=self.usuario, filme=self.filme_antigo)
+        Aluguel.objects.filter(pk=antigo.pk).update(data_de_locacao=date(2001, 5, 10))
+        Aluguel.objects.create(usuario=self.usuario, filme=self.filme_recente)
+
+    def test_criar_particoes_sem_suporte(self):
+        """
+        Testa que o comando de partições não altera a tabela fora do PostgreSQL.
+        """
+        saida = StringIO()
+        call_command('criar_particoes_aluguel', stdout=saida)
+        self.assertIn('permanece comum', saida.getvalue())
+        self.assertEqual(Aluguel.objects.count(), 2)
+
+    def test_arquivar_alugueis_antigos(self):
+        """
+        Testa que apenas os aluguéis antigos são arquivados e removidos do banco.
+        """
+        with tempfile.TemporaryDirectory() as destino:
+            call_command('arquivar_alugueis', meses_retidos=12, destino=destino, stdout=StringIO())
+
+            with gzip.open(os.path.join(destino, 'alugueis_200105.jsonl.gz'), 'rt', encoding='utf-8') as arquivo:
+                linhas = [json.loads(linha) for linha in arquivo]
+
+        self.assertEqual(len(linhas), 1)
+        self.assertEqual(linhas[0]['filme_id'], 'Filme Antigo')
+        self.assertEqual(linhas[0]['data_de_locacao'], '2001-05-10')
+
+        response = Client().get(reverse('filmes_alugados', kwargs={'email': self.usuario.email}))
+        filmes_alugados = json.loads(response.content)
+        self.assertEqual([filme['nome_filme'] for filme in filmes_alugados], ['Filme Recente'])
+
+    def test_arquivar_mes_ja_arquivado(self):
+        """
+        Testa que um novo arquivamento do mesmo mês não sobrescreve o arquivo anterior.
+        """
+        with tempfile.TemporaryDirectory() as destino:
+            call_command('arquivar_alugueis', meses_retidos=12, destino=destino, stdout=StringIO())
+
+            filme = Filme.objects.create(nome='Filme Importado', genero=self.filme_antigo.genero, ano=datetime(2000, 1, 1), diretor='Diretor C', sinopse='Sinopse C')
+            importado = Aluguel.objects.create(usuario=self.usuario, filme=filme)
+            Aluguel.objects.filter(pk=importado.pk).update(data_de_locacao=date(2001, 5, 20))
+            call_command('arquivar_alugueis', meses_retidos=12, destino=destino, stdout=StringIO())
+
+            self.assertEqual(sorted(os.listdir(destino)), ['alugueis_200105.jsonl.gz', 'alugueis_200105_1.jsonl.gz'])
+            filmes = []
+            for nome in sorted(os.listdir(destino)):
+                with gzip.open(os.path.join(destino, nome), 'rt', encoding='utf-8') as arquivo:
+                    filmes.extend(json.loads(linha)['filme_id'] for linha in arquivo)
+
+        self.assertEqual(filmes, ['Filme Antigo', 'Filme Importado'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'O particionamento só é aplicado no PostgreSQL.')
+@override_settings(ALUGUEL_PARTICIONADO=True)
+class ParticionamentoPostgreSQLTest(TestCase):
+    """
+    Testes para o particionamento da tabela de aluguéis no PostgreSQL.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um aluguel no mês atual.
+        contar: Conta as linhas de uma tabela (ou partição).
+        test_converter_e_criar_particoes: Testa a conversão da tabela e a criação das partições mensais.
+        test_mover_linhas_da_particao_padrao: Testa a criação de um mês cujas linhas já estão na partição padrão.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um aluguel no mês atual.
+        """
+        self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        self.filme = Filme.objects.create(nome='Filme A', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2000, 1, 1), diretor='Diretor A', sinopse='Sinopse A')
+        Aluguel.objects.create(usuario=self.usuario, filme=self.filme)
+        self.mes_atual = particionamento.inicio_do_mes(date.today())
+
+    def contar(self, tabela):
+        """
+        Conta as linhas de uma tabela (ou partição).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(tabela)}')
+            return cursor.fetchone()[0]
+
+    def test_converter_e_criar_particoes(self):
+        """
+        Testa a conversão da tabela e a criação das partições mensais.
+        """
+        call_command('criar_particoes_aluguel', meses=1, stdout=StringIO())
+
+        with connection.cursor() as cursor:
+            self.assertTrue(particionamento.tabela_particionada(cursor))
+            self.assertTrue(particionamento.particao_existe(cursor, particionamento.somar_meses(self.mes_atual, 1)))
+        self.assertEqual(self.contar(particionamento.nome_da_particao(self.mes_atual)), 1)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [Aluguel._meta.db_table])
+            self.assertIn('aluguel_data_locacao_idx', [linha[0] for linha in cursor.fetchall()])
+
+    def test_mover_linhas_da_particao_padrao(self):
+        """
+        Testa a criação de um mês cujas linhas já estão na partição padrão.
+        """
+        call_command('criar_particoes_aluguel', meses=0, stdout=StringIO())
+        futuro = particionamento.somar_meses(self.mes_atual, 2)
+        outro = Aluguel.objects.create(usuario=self.usuario, filme=Filme.objects.create(nome='Filme B', genero=self.filme.genero, ano=datetime(2000, 1, 1), diretor='Diretor B', sinopse='Sinopse B'))
+        Aluguel.objects.filter(pk=outro.pk).update(data_de_locacao=futuro)
+        self.assertEqual(self.contar(particionamento.nome_da_particao_padrao()), 1)
+
+        saida = StringIO()
+        call_command('criar_particoes_aluguel', meses=2, stdout=saida)
+
+        self.assertIn(f'1 aluguéis movidos da partição padrão para {particionamento.nome_da_particao(futuro)}', saida.getvalue())
+        self.assertEqual(self.contar(particionamento.nome_da_particao_padrao()), 0)
+        self.assertEqual(self.contar(particionamento.nome_da_particao(futuro)), 1)
+        self.assertEqual(Aluguel.objects.count(), 2)
+
+
+class AdminTest(TestCase):
+    """
+    Testes para a administração dos modelos.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um superusuário, filmes, aluguéis e notas.
+        test_str_aluguel_sem_consultas: Testa que a representação do aluguel não consulta o banco.
+        test_listagem_alugueis: Testa que a listagem de aluguéis usa um número constante de consultas, sem SELECT DISTINCT de datas.
+        test_recalcular_avaliacoes: Testa a ação em lote que recalcula as avaliações dos filmes.
+        test_excluir_notas: Testa a ação em lote que exclui notas e recalcula os filmes afetados.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um superusuário, filmes, aluguéis e notas.
+        """
+        self.admin = User.objects.create_superuser('admin', 'admin@test.com', 'senha')
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        self.filmes = [
+            Filme.objects.create(nome=f'Filme {i}', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2020, 1, 1), diretor='Diretor', sinopse='Sinopse')
+            for i in range(5)
+        ]
+        for i, filme in enumerate(self.filmes):
+            Aluguel.objects.create(usuario=self.usuario, filme=filme)
+            Nota.objects.create(usuario=self.usuario, filme=filme, nota_atribuida_ao_filme=i + 0.5)
+
+    def test_str_aluguel_sem_consultas(self):
+        """
+        Testa que a representação do aluguel não consulta o banco.
+        """
+        aluguel = Aluguel.objects.first()
+        with self.assertNumQueries(0):
+            self.assertEqual(str(aluguel), f'usuario@test.com alugou {aluguel.filme_id}')
+
+    def test_listagem_alugueis(self):
+        """
+        Testa que a listagem de aluguéis usa um número constante de consultas, sem SELECT DISTINCT de datas.
+        """
+        # No PostgreSQL o paginador consulta antes a estimativa de linhas do catálogo.
+        with self.assertNumQueries(5 if connection.vendor == 'postgresql' else 4):
+            response = self.client.get(reverse('admin:filmestop_aluguel_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('admin:filmestop_aluguel_changelist'), {'data_de_locacao__gte': date.today().replace(day=1)})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('DISTINCT' in consulta['sql'] for consulta in consultas.captured_queries))
+
+    def test_recalcular_avaliacoes(self):
+        """
+        Testa a ação em lote que recalcula as avaliações dos filmes.
+        """
+        response = self.client.post(reverse('admin:filmestop_filme_changelist'), {
+            'action': 'recalcular_avaliacoes',
+            '_selected_action': [filme.pk for filme in self.filmes],
+        })
+        self.assertEqual(response.status_code, 302)
+        filme = Filme.objects.get(nome='Filme 3')
+        self.assertEqual(filme.total_avaliacoes, 1)
+        self.assertEqual(filme.nota_final, 3.5)
+
+    def test_excluir_notas(self):
+        """
+        Testa a ação em lote que exclui notas e recalcula os filmes afetados.
+        """
+        Filme.objects.update(total_avaliacoes=1, nota_final=5)
+        nota = Nota.objects.get(filme__nome='Filme 2')
+        response = self.client.post(reverse('admin:filmestop_nota_changelist'), {
+            'action': 'excluir_notas',
+            '_selected_action': [nota.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Nota.objects.filter(pk=nota.pk).exists())
+        filme = Filme.objects.get(nome='Filme 2')
+        self.assertEqual((filme.total_avaliacoes, filme.nota_final), (0, 0))
+        self.assertEqual(Filme.objects.get(nome='Filme 1').total_avaliacoes, 1)
+
+
+class MedirInicializacaoCommandTest(TestCase):
+    """
+    Testes para o comando de medição do tempo de inicialização.
+
+    Métodos:
+        test_tempo_proprio_por_pacote: Testa a soma do tempo próprio de importação por pacote de primeiro nível.
+    """
+
+    def test_tempo_proprio_por_pacote(self):
+        """
+        Testa a soma do tempo próprio de importação por pacote de primeiro nível.
+        """
+        from .management.commands.medir_inicializacao import Command
+
+        saida = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     django.utils.version\n"
+            "import time:       380 |        500 |   django\n"
+            "import time:        50 |         50 | decouple\n"
+        )
+        self.assertEqual(Command.tempo_proprio_por_pacote(saida), {'django': 500, 'decouple': 50})
+
+
+class CamposSelecionaveisTest(TestCase):
+    """
+    Testes para a seleção de campos (`?fields=`) nas views de leitura.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um usuário, um filme, um aluguel e uma nota.
+        test_filmes_por_genero_com_campos: Testa que apenas os campos solicitados são retornados.
+        test_campo_invalido: Testa a resposta quando um campo não permitido é solicitado.
+        test_filmes_alugados_com_campos: Testa a seleção de campos nos filmes alugados sem ler a sinopse.
+        test_filmes_alugados_consultas: Testa que a lista de filmes alugados não faz uma consulta por aluguel.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um usuário, um filme, um aluguel e uma nota.
+        """
+        self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+        Aluguel.objects.create(usuario=self.usuario, filme=self.filme)
+        Nota.objects.create(usuario=self.usuario, filme=self.filme, nota_atribuida_ao_filme=9.0)
+
+    def test_filmes_por_genero_com_campos(self):
+        """
+        Testa que apenas os campos solicitados são retornados.
+        """
+        response = Client().get(reverse('filmes_por_genero', kwargs={'genero': 'Aventura'}), {'fields': 'nome,nota_final'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), [{'nome': 'Filme X', 'nota_final': 0.0}])
+
+    def test_campo_invalido(self):
+        """
+        Testa a resposta quando um campo não permitido é solicitado.
+        """
+        response = Client().get(reverse('filme_por_nome', kwargs={'nome': 'Filme X'}), {'fields': 'nome,senha'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('senha', json.loads(response.content)['mensagem'])
+
+    def test_filmes_alugados_com_campos(self):
+        """
+        Testa a seleção de campos nos filmes alugados sem ler a sinopse.
+        """
+        with CaptureQueriesContext(connection) as consultas:
+            response = Client().get(reverse('filmes_alugados', kwargs={'email': self.usuario.email}), {'fields': 'nome_filme,nota_do_filme'})
+        self.assertEqual(json.loads(response.content), [{'nome_filme': 'Filme X', 'nota_do_filme': 9.0}])
+        self.assertFalse(any('sinopse' in consulta['sql'] for consulta in consultas.captured_queries))
+
+    def test_filmes_alugados_consultas(self):
+        """
+        Testa que a lista de filmes alugados não faz uma consulta por aluguel.
+        """
+        outro = Filme.objects.create(nome='Filme Y', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2021, 1, 1), diretor='Diretor Y', sinopse='Sinopse Y')
+        Aluguel.objects.create(usuario=self.usuario, filme=outro)
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('filmes_alugados', kwargs={'email': self.usuario.email}))
+        filmes_alugados = {filme['nome_filme']: filme for filme in json.loads(response.content)}
+        self.assertEqual(set(filmes_alugados), {'Filme X', 'Filme Y'})
+        self.assertEqual(filmes_alugados['Filme X']['sinopse_filme'], 'Sinopse X')
+        self.assertEqual(filmes_alugados['Filme X']['nota_do_filme'], 9.0)
+        self.assertIsNone(filmes_alugados['Filme Y']['nota_do_filme'])
+
+
+class HistogramaDeNotasTest(TestCase):
+    """
+    Testes para o histograma de notas e o endpoint de estatísticas.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com usuários e um filme.
+        test_histograma_atualizado_ao_dar_nota: Testa que a nota atribuída é contabilizada no histograma do filme.
+        test_estatisticas_do_filme: Testa a distribuição, a mediana e os percentis retornados.
+        test_estatisticas_filme_sem_notas: Testa as estatísticas de um filme sem notas.
+        test_reconstruir_histogramas: Testa a reconstrução dos histogramas a partir da tabela de notas.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com usuários e um filme.
+        """
+        self.usuarios = [
+            Usuario.objects.create(email=f'usuario{i}@test.com', nome=f'Usuário {i}', celular=f'(98)9000-000{i}')
+            for i in range(4)
+        ]
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+
+    def dar_nota(self, usuario, nota):
+        return Client().post(reverse('dar_nota_ao_filme', kwargs={'email': usuario.email, 'nome': self.filme.nome}), json.dumps(nota), content_type='application/json')
+
+    def test_histograma_atualizado_ao_dar_nota(self):
+        """
+        Testa que a nota atribuída é contabilizada no histograma do filme.
+        """
+        self.assertEqual(self.dar_nota(self.usuarios[0], 7.3).status_code, 201)
+        self.filme.refresh_from_db()
+        self.assertEqual(sum(self.filme.histograma_notas), 1)
+        self.assertEqual(self.filme.histograma_notas[15], 1)
+
+    def test_estatisticas_do_filme(self):
+        """
+        Testa a distribuição, a mediana e os percentis retornados.
+        """
+        for usuario, nota in zip(self.usuarios, (2.0, 6.0, 8.0, 9.5)):
+            self.dar_nota(usuario, nota)
+
+        with self.assertNumQueries(1):
+            response = Client().get(reverse('estatisticas_do_filme', kwargs={'nome': 'Filme X'}))
+        dados = json.loads(response.content)
+        self.assertEqual(dados['total_avaliacoes'], 4)
+        self.assertEqual(dados['distribuicao']['8.0'], 1)
+        self.assertEqual(len(dados['distribuicao']), 21)
+        self.assertEqual(dados['mediana'], 6.0)
+        self.assertEqual(dados['percentis']['p90'], 9.5)
+
+    def test_estatisticas_filme_sem_notas(self):
+        """
+        Testa as estatísticas de um filme sem notas.
+        """
+        dados = json.loads(Client().get(reverse('estatisticas_do_filme', kwargs={'nome': 'Filme X'})).content)
+        self.assertIsNone(dados['mediana'])
+        self.assertEqual(sum(dados['distribuicao'].values()), 0)
+
+    def test_reconstruir_histogramas(self):
+        """
+        Testa a reconstrução dos histogramas a partir da tabela de notas.
+        """
+        Nota.objects.create(usuario=self.usuarios[0], filme=self.filme, nota_atribuida_ao_filme=4.0)
+        Nota.objects.create(usuario=self.usuarios[1], filme=self.filme, nota_atribuida_ao_filme=4.2)
+        Nota.objects.create(usuario=self.usuarios[2], filme=self.filme, nota_atribuida_ao_filme=10.0)
+
+        call_command('reconstruir_histogramas', stdout=StringIO())
+        self.filme.refresh_from_db()
+        self.assertEqual(self.filme.histograma_notas[8], 2)
+        self.assertEqual(self.filme.histograma_notas[20], 1)
+        self.assertEqual(sum(self.filme.histograma_notas), 3)
+
+
+class OutboxTest(TransactionTestCase):
+    """
+    Testes para a outbox transacional de aluguéis e notas.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um usuário e um filme.
+        test_eventos_gravados_com_aluguel_e_nota: Testa que alugar e dar nota gravam os eventos correspondentes.
+        test_transmitir_eventos_em_ordem: Testa a entrega ordenada em lotes e o avanço do offset do consumidor.
+        test_transmitir_eventos_ndjson: Testa a entrega dos eventos para um arquivo NDJSON e a limpeza dos eventos entregues.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um usuário e um filme.
+        """
+        DestinoMemoria.eventos.clear()
+        self.usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        self.filme = Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+
+    def alugar_e_dar_nota(self):
+        client = Client()
+        client.post(reverse('alugar_filme', kwargs={'email': self.usuario.email}), json.dumps(self.filme.nome), content_type='application/json')
+        client.post(reverse('dar_nota_ao_filme', kwargs={'email': self.usuario.email, 'nome': self.filme.nome}), json.dumps(8.0), content_type='application/json')
+
+    def test_eventos_gravados_com_aluguel_e_nota(self):
+        """
+        Testa que alugar e dar nota gravam os eventos correspondentes.
+        """
+        self.alugar_e_dar_nota()
+        eventos = list(Evento.objects.order_by('id'))
+        self.assertEqual([evento.tipo for evento in eventos], [Evento.ALUGUEL_CRIADO, Evento.NOTA_CRIADA])
+        self.assertEqual(eventos[0].payload['filme'], 'Filme X')
+        self.assertEqual(eventos[1].payload['nota'], 8.0)
+
+    def test_transmitir_eventos_em_ordem(self):
+        """
+        Testa a entrega ordenada em lotes e o avanço do offset do consumidor.
+        """
+        self.alugar_e_dar_nota()
+        call_command('transmitir_eventos', destino='memoria', tamanho_lote=1, stdout=StringIO())
+
+        self.assertEqual([evento['tipo'] for evento in DestinoMemoria.eventos], [Evento.ALUGUEL_CRIADO, Evento.NOTA_CRIADA])
+        self.assertEqual(OffsetDeConsumidor.objects.get(consumidor='memoria').ultimo_evento, DestinoMemoria.eventos[-1]['id'])
+
+        call_command('transmitir_eventos', destino='memoria', stdout=StringIO())
+        self.assertEqual(len(DestinoMemoria.eventos), 2)
+
+    def test_transmitir_eventos_ndjson(self):
+        """
+        Testa a entrega dos eventos para um arquivo NDJSON e a limpeza dos eventos entregues.
+        """
+        self.alugar_e_dar_nota()
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'eventos.ndjson')
+            call_command('transmitir_eventos', destino='ndjson', caminho=caminho, limpar=True, stdout=StringIO())
+            with open(caminho, encoding='utf-8') as arquivo:
+                eventos = [json.loads(linha) for linha in arquivo]
+
+        self.assertEqual([evento['payload']['usuario'] for evento in eventos], ['usuario@test.com'] * 2)
+        self.assertFalse(Evento.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'O bloqueio de linhas só é verificado no PostgreSQL.')
+class ReconstruirHistogramasConcorrenciaTest(TransactionTestCase):
+    """
+    Testes para o bloqueio dos filmes durante a reconstrução dos histogramas.
+
+    Métodos:
+        test_filmes_bloqueados_durante_agregacao: Testa que os filmes estão bloqueados enquanto as notas são agregadas.
+    """
+
+    def test_filmes_bloqueados_durante_agregacao(self):
+        """
+        Testa que os filmes estão bloqueados enquanto as notas são agregadas.
+        """
+        Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Drama'), ano=datetime(2020, 1, 1), diretor='Diretor', sinopse='Sinopse')
+        erros = []
+
+        def tentar_bloquear():
+            try:
+                with transaction.atomic():
+                    Filme.objects.select_for_update(nowait=True).get(nome='Filme X')
+            except DatabaseError as erro:
+                erros.append(erro)
+            finally:
+                connection.close()
+
+        def agregar(notas):
+            outra = threading.Thread(target=tentar_bloquear)
+            outra.start()
+            outra.join(5)
+            return histogramas_por_filme(notas)
+
+        with mock.patch('filmestop.repositories.repositories.histogramas_por_filme', agregar):
+            FilmeRepository.reconstruir_histogramas()
+        self.assertEqual(len(erros), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'O limite de visibilidade da outbox só é usado no PostgreSQL.')
+class OutboxConcorrenciaTest(TransactionTestCase):
+    """
+    Testes para a ordem de visibilidade dos eventos gravados por transações simultâneas.
+
+    Métodos:
+        em_transacao: Executa os passos informados em uma transação de outra thread.
+        test_transacao_aberta_nao_e_pulada: Testa que um evento de transação aberta não é pulado pelo relay, sem bloquear outras gravações.
+    """
+
+    def em_transacao(self, *passos):
+        """
+        Executa os passos informados em uma transação de outra thread.
+        """
+        def executar():
+            try:
+                with transaction.atomic():
+                    for passo in passos:
+                        passo()
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=executar)
+        thread.start()
+        return thread
+
+    def test_transacao_aberta_nao_e_pulada(self):
+        """
+        Testa que um evento de transação aberta não é pulado pelo relay, sem bloquear outras gravações.
+        """
+        DestinoMemoria.eventos.clear()
+        xid_obtido, aberto_gravado, liberar = threading.Event(), threading.Event(), threading.Event()
+
+        def obter_xid():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_current_xact_id()')
+            xid_obtido.set()
+
+        # A transação "antiga" obtém seu xid primeiro, mas grava o evento depois (com `id` maior) que a
+        # transação "aberta", que continua sem COMMIT.
+        antiga = self.em_transacao(obter_xid, lambda: aberto_gravado.wait(5), lambda: EventoRepository.registrar('antiga', {}))
+        xid_obtido.wait(5)
+        aberta = self.em_transacao(lambda: EventoRepository.registrar('aberta', {}), aberto_gravado.set, lambda: liberar.wait(5))
+
+        antiga.join(5)
+        self.assertFalse(antiga.is_alive())
+        self.assertEqual(outbox.transmitir(DestinoMemoria(), 'memoria'), 1)
+
+        liberar.set()
+        aberta.join(5)
+        self.assertEqual(outbox.transmitir(DestinoMemoria(), 'memoria'), 1)
+        self.assertEqual([evento['tipo'] for evento in DestinoMemoria.eventos], ['antiga', 'aberta'])
+        self.assertGreater(DestinoMemoria.eventos[0]['id'], DestinoMemoria.eventos[1]['id'])
+
+
+class GenerosTest(TestCase):
+    """
+    Testes para a tabela de gêneros e os totais de filmes por gênero.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com filmes de dois gêneros.
+        test_get_ou_criar_sem_diferenciar_maiusculas: Testa que gêneros com grafias diferentes são o mesmo registro.
+        test_chave_unica_com_acentos: Testa que a chave normalizada impede gêneros duplicados com acentos em outra grafia.
+        test_listar_generos: Testa a listagem de gêneros com a quantidade de filmes.
+        test_totais_ao_alterar_e_remover_filmes: Testa a atualização dos totais ao alterar o gênero e remover filmes.
+        test_filmes_por_genero_sem_diferenciar_maiusculas: Testa a busca de filmes pelo gênero em outra grafia.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com filmes de dois gêneros.
+        """
+        self.acao = GeneroRepository.get_ou_criar('Ação')
+        self.drama = GeneroRepository.get_ou_criar('Drama')
+        for i in range(3):
+            Filme.objects.create(nome=f'Filme {i}', genero=self.acao, ano=datetime(2020, 1, 1), diretor='Diretor', sinopse='Sinopse')
+        Filme.objects.create(nome='Filme D', genero=self.drama, ano=datetime(2020, 1, 1), diretor='Diretor', sinopse='Sinopse')
+
+    def test_get_ou_criar_sem_diferenciar_maiusculas(self):
+        """
+        Testa que gêneros com grafias diferentes são o mesmo registro.
+        """
+        self.assertEqual(GeneroRepository.get_ou_criar(' DRAMA ').pk, self.drama.pk)
+        self.assertEqual(GeneroRepository.get_ou_criar('AÇÃO').pk, self.acao.pk)
+        self.assertEqual(Genero.objects.count(), 2)
+
+    def test_chave_unica_com_acentos(self):
+        """
+        Testa que a chave normalizada impede gêneros duplicados com acentos em outra grafia.
+        """
+        self.assertEqual(self.acao.chave, 'ação')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Genero.objects.create(nome='AÇÃO')
+        with self.assertRaises(ValidationError):
+            Genero(nome=' açÃo ').full_clean()
+
+    def test_listar_generos(self):
+        """
+        Testa a listagem de gêneros com a quantidade de filmes.
+        """
+        with self.assertNumQueries(1):
+            response = Client().get(reverse('generos'))
+        self.assertEqual(json.loads(response.content), [
+            {'nome': 'Ação', 'total_filmes': 3},
+            {'nome': 'Drama', 'total_filmes': 1},
+        ])
+
+    def test_totais_ao_alterar_e_remover_filmes(self):
+        """
+        Testa a atualização dos totais ao alterar o gênero e remover filmes.
+        """
+        filme = Filme.objects.get(nome='Filme 0')
+        filme.genero = self.drama
+        filme.save()
+        Filme.objects.filter(nome='Filme 1').delete()
+
+        self.acao.refresh_from_db()
+        self.drama.refresh_from_db()
+        self.assertEqual((self.acao.total_filmes, self.drama.total_filmes), (1, 2))
+
+        Genero.objects.update(total_filmes=0)
+        GeneroRepository.recalcular_totais()
+        self.assertEqual(dict(Genero.objects.values_list('nome', 'total_filmes')), {'Ação': 1, 'Drama': 2})
+
+    def test_filmes_por_genero_sem_diferenciar_maiusculas(self):
+        """
+        Testa a busca de filmes pelo gênero em outra grafia.
+        """
+        response = Client().get(reverse('filmes_por_genero', kwargs={'genero': 'drama'}), {'fields': 'nome,genero'})
+        self.assertEqual(json.loads(response.content), [{'nome': 'Filme D', 'genero': 'Drama'}])
+        response = Client().get(reverse('filmes_por_genero', kwargs={'genero': 'AÇÃO'}), {'fields': 'nome'})
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+
+class PerfilMiddlewareTest(TestCase):
+    """
+    Testes para a captura de perfis de requisições e o relatório agregado.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com um filme e um diretório temporário para os perfis.
+        test_perfil_amostrado_cprofile: Testa a gravação de um perfil sorteado no modo cProfile, com o SQL da requisição.
+        test_perfil_requisicao_lenta_amostragem: Testa a gravação de requisições lentas no modo de amostragem.
+        test_rotacao_e_relatorio: Testa o limite de arquivos por URL e o relatório agregado.
+        test_amostrador_nao_altera_pilhas_apos_parar: Testa que uma amostra tirada antes de `parar` não altera as pilhas depois dele.
+        test_falha_ao_montar_perfil_nao_afeta_resposta: Testa que uma falha ao montar o perfil não afeta a resposta.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com um filme e um diretório temporário para os perfis.
+        """
+        Filme.objects.create(nome='Filme X', genero=GeneroRepository.get_ou_criar('Aventura'), ano=datetime(2022, 9, 12), diretor='Diretor X', sinopse='Sinopse X')
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = diretorio.name
+
+    def configuracao(self, **kwargs):
+        return override_settings(
+            MIDDLEWARE=['filmestop.perfil.PerfilMiddleware'] + settings.MIDDLEWARE,
+            PERFIL_DIR=self.diretorio,
+            **kwargs,
+        )
+
+    def perfis(self, url_name):
+        destino = os.path.join(self.diretorio, url_name)
+        perfis = []
+        for nome in sorted(os.listdir(destino)):
+            with open(os.path.join(destino, nome), encoding='utf-8') as arquivo:
+                perfis.append(json.load(arquivo))
+        return perfis
+
+    def test_perfil_amostrado_cprofile(self):
+        """
+        Testa a gravação de um perfil sorteado no modo cProfile, com o SQL da requisição.
+        """
+        with self.configuracao(PERFIL_MODO='cprofile', PERFIL_TAXA_AMOSTRAGEM=1.0, PERFIL_LIMITE_MS=60000):
+            Client().get(reverse('filme_por_nome', kwargs={'nome': 'Filme X'}))
+
+        perfil, = self.perfis('filme_por_nome')
+        self.assertEqual((perfil['motivo'], perfil['modo'], perfil['status']), ('amostra', 'cprofile', 200))
+        self.assertTrue(any('filmestop_filme' in consulta['sql'] for consulta in perfil['consultas']))
+        self.assertTrue(any('(get_filme_por_nome)' in rotulo for rotulo in perfil['funcoes']))
+
+    def test_perfil_requisicao_lenta_amostragem(self):
+        """
+        Testa a gravação de requisições lentas no modo de amostragem.
+        """
+        with self.configuracao(PERFIL_MODO='amostragem', PERFIL_TAXA_AMOSTRAGEM=0.0, PERFIL_LIMITE_MS=0):
+            Client().get(reverse('generos'))
+
+        perfil, = self.perfis('generos')
+        self.assertEqual((perfil['motivo'], perfil['modo']), ('lenta', 'amostragem'))
+        self.assertEqual(len(perfil['consultas']), 1)
+
+    def test_rotacao_e_relatorio(self):
+        """
+        Testa o limite de arquivos por URL e o relatório agregado.
+        """
+        with self.configuracao(PERFIL_MODO='cprofile', PERFIL_TAXA_AMOSTRAGEM=1.0, PERFIL_MAX_ARQUIVOS=2):
+            for _ in range(4):
+                Client().get(reverse('filmes_por_genero', kwargs={'genero': 'Aventura'}))
+
+        self.assertEqual(len(self.perfis('filmes_por_genero')), 2)
+
+        saida = StringIO()
+        call_command('relatorio_perfis', diretorio=self.diretorio, top=5, stdout=saida)
+        self.assertIn('filmes_por_genero', saida.getvalue())
+        self.assertIn('Funções com maior tempo próprio', saida.getvalue())
+
+    def test_amostrador_nao_altera_pilhas_apos_parar(self):
+        """
+        Testa que uma amostra tirada antes de `parar` não altera as pilhas depois dele.
+        """
+        amostrador = Amostrador(0)
+        amostrador.thread = threading.current_thread()
+        thread_id = threading.get_ident()
+        pilhas = amostrador.iniciar(thread_id)
+
+        def frames_e_parar():
+            # A requisição termina entre a leitura das pilhas e a atualização do contador.
+            frames = {thread_id: sys._getframe()}
+            amostrador.parar(thread_id)
+            return frames
+
+        with mock.patch.object(sys, '_current_frames', frames_e_parar), mock.patch('filmestop.perfil.time.sleep', side_effect=[None, StopIteration]):
+            with self.assertRaises(StopIteration):
+                amostrador.executar()
+        self.assertEqual(pilhas, {})
+
+    def test_falha_ao_montar_perfil_nao_afeta_resposta(self):
+        """
+        Testa que uma falha ao montar o perfil não afeta a resposta.
+        """
+        with self.configuracao(PERFIL_MODO='amostragem', PERFIL_LIMITE_MS=0), mock.patch('filmestop.perfil.funcoes_das_pilhas', side_effect=RuntimeError):
+            response = Client().get(reverse('generos'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(os.path.join(self.diretorio, 'generos')))
+
+
+class FilmesPorNomesViewTest(TestCase):
+    """
+    Testes para a busca de filmes em lote por nome.
+
+    Métodos:
+        setUp: Configura o ambiente de teste com dois filmes e o cache vazio.
+        buscar: Envia a lista de nomes para a view e retorna a resposta.
+        test_filmes_encontrados_e_ausentes: Testa os resultados por nome, na ordem enviada, com uma única consulta.
+        test_campos_selecionados: Testa a busca em lote com o parâmetro `fields`.
+        test_corpo_invalido: Testa a resposta para corpos que não são uma lista de nomes ou excedem o limite.
+        test_titulo_com_acentos: Testa que títulos com acentos são encontrados como na busca de um filme por nome.
+        test_cache_por_filme: Testa a leitura em lote do cache e a invalidação ao alterar um filme.
+        test_cache_invalidado_por_atualizacoes_em_lote: Testa a invalidação do cache pelo recálculo das avaliações e ao renomear o gênero.
+    """
+
+    def setUp(self):
+        """
+        Configura o ambiente de teste com dois filmes e o cache vazio.
+        """
+        caches[settings.FILME_CACHE_ALIAS].clear()
+        drama = GeneroRepository.get_ou_criar('Drama')
+        self.filme_a = Filme.objects.create(nome='Filme A', genero=drama, ano=datetime(2020, 1, 1), diretor='Diretor A', sinopse='Sinopse A')
+        Filme.objects.create(nome='Filme B', genero=drama, ano=datetime(2021, 1, 1), diretor='Diretor B', sinopse='Sinopse B')
+
+    def buscar(self, nomes, **parametros):
+        """
+        Envia a lista de nomes para a view e retorna a resposta.
+        """
+        url = reverse('filmes_por_nomes')
+        if parametros:
+            url += '?' + '&'.join(f'{chave}={valor}' for chave, valor in parametros.items())
+        return Client().post(url, json.dumps(nomes), content_type='application/json')
+
+    def test_filmes_encontrados_e_ausentes(self):
+        """
+        Testa os resultados por nome, na ordem enviada, com uma única consulta.
+        """
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.buscar(['filme b', 'Filme Z', 'Filme A'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(consultas), 1)
+        resultados = response.json()['resultados']
+        self.assertEqual([r['nome_solicitado'] for r in resultados], ['filme b', 'Filme Z', 'Filme A'])
+        self.assertEqual([r['encontrado'] for r in resultados], [True, False, True])
+        self.assertEqual(resultados[0]['filme']['nome'], 'Filme B')
+        self.assertEqual(resultados[0]['filme']['genero'], 'Drama')
+        self.assertIsNone(resultados[1]['filme'])
+
+    def test_campos_selecionados(self):
+        """
+        Testa a busca em lote com o parâmetro `fields`.
+        """
+        response = self.buscar(['Filme A'], fields='ano,diretor')
+        self.assertEqual(response.json()['resultados'][0]['filme'], {'ano': '2020-01-01', 'diretor': 'Diretor A'})
+
+    def test_corpo_invalido(self):
+        """
+        Testa a resposta para corpos que não são uma lista de nomes ou excedem o limite.
+        """
+        self.assertEqual(self.buscar({'nome': 'Filme A'}).status_code, 400)
+        self.assertEqual(self.buscar(['Filme A', 1]).status_code, 400)
+        with override_settings(FILMES_POR_NOMES_MAXIMO=1):
+            response = self.buscar(['Filme A', 'Filme B'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['status'], 'erro')
+
+    def test_titulo_com_acentos(self):
+        """
+        Testa que títulos com acentos são encontrados como na busca de um filme por nome.
+        """
+        Filme.objects.create(nome='O Poderoso Chefão', genero=self.filme_a.genero, ano=datetime(1972, 1, 1), diretor='Coppola', sinopse='Sinopse')
+        nomes = ['O Poderoso Chefão', 'o poderoso chefão', 'O PODEROSO CHEFÃO']
+
+        resultados = self.buscar(nomes).json()['resultados']
+        for nome, resultado in zip(nomes, resultados):
+            individual = Client().get(reverse('filme_por_nome', kwargs={'nome': nome}))
+            self.assertEqual(resultado['encontrado'], individual.status_code == 200, nome)
+        self.assertEqual(resultados[0]['filme']['nome'], 'O Poderoso Chefão')
+        self.assertTrue(resultados[1]['encontrado'])
+
+    def test_cache_por_filme(self):
+        """
+        Testa a leitura em lote do cache e a invalidação ao alterar um filme.
+        """
+        with override_settings(FILME_CACHE_TIMEOUT=60):
+            self.buscar(['Filme A', 'Filme B'])
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.buscar(['Filme A', 'Filme B'])
+            self.assertEqual(len(consultas), 0)
+            self.assertTrue(all(r['encontrado'] for r in response.json()['resultados']))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.filme_a.diretor = 'Outro Diretor'
+                self.filme_a.save()
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.buscar(['Filme A', 'Filme B'])
+            self.assertEqual(len(consultas), 1)
+            self.assertEqual(response.json()['resultados'][0]['filme']['diretor'], 'Outro Diretor')
+
+    def test_cache_invalidado_por_atualizacoes_em_lote(self):
+        """
+        Testa a invalidação do cache pelo recálculo das avaliações e ao renomear o gênero.
+        """
+        usuario = Usuario.objects.create(email='usuario@test.com', nome='Usuário Teste', celular="(98)93233-4221")
+        Nota.objects.create(usuario=usuario, filme=self.filme_a, nota_atribuida_ao_filme=8.0)
+
+        with override_settings(FILME_CACHE_TIMEOUT=60):
+            self.buscar(['Filme A'])
+            with self.captureOnCommitCallbacks(execute=True):
+                FilmeRepository.recalcular_avaliacoes(Filme.objects.filter(nome='Filme A'))
+            filme = self.buscar(['Filme A']).json()['resultados'][0]['filme']
+            self.assertEqual((filme['total_avaliacoes'], filme['nota_final']), (1, 8.0))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                genero = self.filme_a.genero
+                genero.nome = 'Dramas'
+                genero.save()
+            filme = self.buscar(['Filme A']).json()['resultados'][0]['filme']
+            self.assertEqual(filme['genero'], 'Dramas')
+
+
+class ConfiguracaoDoCacheTest(TestCase):
+    """
+    Testes para a configuração do cache por URL e a verificação do cache por filme.
+
+    Métodos:
+        test_cache_da_url: Testa a configuração gerada para cada esquema de URL.
+        test_verificacao_recusa_memoria_local: Testa que o cache por filme em memória local é recusado pela verificação de sistema.
+    """
+
+    def test_cache_da_url(self):
+        """
+        Testa a configuração gerada para cada esquema de URL.
+        """
+        self.assertEqual(cache_da_url('redis://:senha@redis:6379/1'), {'BACKEND': 'django_redis.cache.RedisCache', 'LOCATION': 'redis://:senha@redis:6379/1'})
+        self.assertEqual(cache_da_url('memcache://m1:11211,m2:11211')['LOCATION'], ['m1:11211', 'm2:11211'])
+        self.assertEqual(cache_da_url('locmem://')['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        with self.assertRaises(ValueError):
+            cache_da_url('ftp://cache')
+
+    def test_verificacao_recusa_memoria_local(self):
+        """
+        Testa que o cache por filme em memória local é recusado pela verificação de sistema.
+        """
+        local = {'default': cache_da_url('locmem://')}
+        compartilhado = {'default': cache_da_url('memcache://memcached:11211')}
+        with override_settings(CACHES=local, FILME_CACHE_TIMEOUT=0):
+            self.assertEqual(verificar_cache_de_filmes(None), [])
+        with override_settings(CACHES=local, FILME_CACHE_TIMEOUT=60):
+            self.assertEqual([erro.id for erro in verificar_cache_de_filmes(None)], ['filmestop.E001'])
+        with override_settings(CACHES=compartilhado, FILME_CACHE_TIMEOUT=60):
+            self.assertEqual(verificar_cache_de_filmes(None), [])
+        with override_settings(CACHES=compartilhado, FILME_CACHE_TIMEOUT=60, FILME_CACHE_ALIAS='filmes'):
+            self.assertEqual([erro.id for erro in verificar_cache_de_filmes(None)], ['filmestop.E002'])
@@ -9,11 +9,12 @@ Estas views são responsáveis por lidar com as solicitações HTTP para diferen
    - **Parâmetro da URL:**
      - `genero` (do tipo `str`): O gênero dos filmes a serem retornados. Deve ser passado como uma string na URL.
    - **Lógica de Negócio:**
-     - Recupera o gênero da URL e usa o `FilmeRepository` para buscar filmes que correspondem ao gênero fornecido.
+     - Recupera o gênero da URL e usa o `FilmeRepository` para buscar filmes que correspondem ao gênero fornecido (sem diferenciar maiúsculas e minúsculas).
      - Converte a consulta em uma lista de filmes.
      - Se nenhum filme for encontrado, retorna uma resposta JSON com status 404 e uma mensagem de erro indicando que nenhum filme foi encontrado para o gênero especificado.
      - Se filmes forem encontrados, retorna uma resposta JSON com a lista de filmes e status 200.
      - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Parâmetro de consulta opcional:** `fields` — lista de campos separados por vírgula (ex.: `?fields=nome,genero`). Apenas esses campos são lidos do banco e retornados.
    - **Nome da URL:** `filmes_por_genero`
 
 2. **Classe: `FilmePorNomeView`**
@@ -27,6 +28,7 @@ Estas views são responsáveis por lidar com as solicitações HTTP para diferen
      - Se o filme não for encontrado, retorna uma resposta JSON com status 404 e uma mensagem de erro indicando que nenhum filme foi encontrado com o nome fornecido.
      - Se o filme for encontrado, retorna uma resposta JSON com os detalhes do filme e status 200.
      - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Parâmetro de consulta opcional:** `fields` — lista de campos separados por vírgula, como em `FilmePorGeneroView`.
    - **Nome da URL:** `filme_por_nome`
 
 3. **Classe: `AlugarFilmePorNomeView`**
@@ -40,7 +42,7 @@ Estas views são responsáveis por lidar com as solicitações HTTP para diferen
      - Recupera o email do usuário da URL e o nome do filme do corpo da requisição.
      - Verifica se o usuário existe. Se não existir, retorna uma resposta JSON com status 404 e uma mensagem de erro indicando que o usuário não foi encontrado.
      - Verifica se o filme existe. Se não existir, retorna uma resposta JSON com status 404 e uma mensagem de erro indicando que o filme não foi encontrado.
-     - Verifica se o usuário já alugou o filme. Se não, cria um novo aluguel e retorna uma resposta JSON com status 201 e uma mensagem de sucesso.
+     - Verifica se o usuário já alugou o filme com a linha do usuário bloqueada (`select_for_update`), o que serializa aluguéis simultâneos do mesmo usuário. Se não, cria um novo aluguel e, na mesma transação, um evento `aluguel_criado` na outbox, e retorna uma resposta JSON com status 201 e uma mensagem de sucesso.
      - Se o usuário já alugou o filme, retorna uma resposta JSON com status 400 e uma mensagem indicando que o filme já foi alugado.
      - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
    - **Nome da URL:** `alugar_filme`
@@ -57,7 +59,7 @@ Estas views são responsáveis por lidar com as solicitações HTTP para diferen
      - Recupera o email do usuário e o nome do filme da URL e a nota do corpo da requisição.
      - Verifica se o usuário e o filme existem. Se algum deles não existir, retorna uma resposta JSON com status 404 e uma mensagem de erro apropriada.
      - Verifica se a nota está dentro do intervalo permitido (0.0 a 10.0). Se a nota estiver fora desse intervalo, retorna uma resposta JSON com status 400 e uma mensagem indicando que a nota não é permitida.
-     - Verifica se o usuário já atribuiu uma nota ao filme. Se não, cria uma nova nota e atualiza o total de avaliações e a nota final do filme.
+     - Verifica se o usuário já atribuiu uma nota ao filme. Se não, cria uma nova nota, um evento `nota_criada` na outbox e atualiza o total de avaliações, a nota final e o histograma de notas do filme, tudo na mesma transação.
      - Se o usuário já atribuiu uma nota, retorna uma resposta JSON com status 400 e uma mensagem indicando que a nota já foi atribuída.
      - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
    - **Nome da URL:** `dar_nota_ao_filme`
@@ -70,28 +72,68 @@ Estas views são responsáveis por lidar com as solicitações HTTP para diferen
    - **Lógica de Negócio:**
      - Recupera o email do usuário da URL e usa o `AluguelRepository` para buscar todos os filmes alugados pelo usuário.
      - Verifica se o usuário existe. Se não existir, retorna uma resposta JSON com status 404 e uma mensagem de erro indicando que o usuário não foi encontrado.
-     - Constrói uma lista de filmes alugados, incluindo detalhes do filme e da nota atribuída (se disponível).
+     - Constrói, em uma única consulta, uma lista de filmes alugados, incluindo detalhes do filme e da nota atribuída (se disponível).
      - Retorna uma resposta JSON com a lista de filmes alugados e status 200.
      - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Parâmetro de consulta opcional:** `fields` — lista de campos separados por vírgula (ex.: `?fields=nome_filme,data_de_locacao`). Campos não solicitados, como `sinopse_filme`, não são lidos do banco.
    - **Nome da URL:** `filmes_alugados`
+
+6. **Classe: `EstatisticasDoFilmeView`**
+   - **Método:** `get`
+   - **URL:** `filmes/estatisticas/<str:nome>/`
+   - **Parâmetro da URL:**
+     - `nome` (do tipo `str`): O nome do filme. Deve ser passado como uma string na URL.
+   - **Lógica de Negócio:**
+     - Recupera o filme pelo nome e lê o histograma de notas mantido em `Filme.histograma_notas`, sem consultar a tabela de notas.
+     - Retorna a distribuição das notas em faixas de 0.5, a mediana e os percentis 10, 25, 50, 75 e 90 (ou `null` se o filme não tiver notas).
+     - Se o filme não for encontrado, retorna uma resposta JSON com status 404 e uma mensagem de erro.
+     - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Nome da URL:** `estatisticas_do_filme`
+
+7. **Classe: `GenerosView`**
+   - **Método:** `get`
+   - **URL:** `filmes/generos/`
+   - **Lógica de Negócio:**
+     - Retorna os gêneros que possuem filmes, em ordem alfabética, com a quantidade de filmes de cada um.
+     - A quantidade é lida de `Genero.total_filmes`, mantido ao inserir e remover filmes, sem agrupar a tabela de filmes.
+     - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Nome da URL:** `generos`
+
+8. **Classe: `FilmesPorNomesView`**
+   - **Método:** `post`
+   - **URL:** `filmes/nomes/`
+   - **Corpo da Requisição (Payload JSON):**
+     - Uma lista com os nomes dos filmes. Exemplo: `["Filme X", "Filme Y"]`
+   - **Lógica de Negócio:**
+     - Busca todos os filmes com uma única consulta (ou leitura em lote do cache por filme, se habilitado), sem diferenciar maiúsculas e minúsculas.
+     - Retorna, na ordem recebida, um resultado por nome com `nome_solicitado`, `encontrado` e `filme` (`null` quando o filme não existe).
+     - Aceita o parâmetro de consulta opcional `fields`, como em `FilmePorGeneroView`.
+     - Se o corpo não for uma lista de nomes ou tiver mais nomes que `FILMES_POR_NOMES_MAXIMO`, retorna uma resposta JSON com status 400.
+     - Em caso de exceção, retorna uma resposta JSON com status 400 e a mensagem de erro.
+   - **Nome da URL:** `filmes_por_nomes`
 """
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from .repositories.repositories import FilmeRepository, NotaRepository, AluguelRepository, UsuarioRepository
-from .models import Filme, Usuario, Aluguel, Nota
+from .repositories.repositories import FilmeRepository, NotaRepository, AluguelRepository, UsuarioRepository, EventoRepository, GeneroRepository
+from .campos import CamposSelecionaveis
+from .histograma import adicionar_nota, resumo
+from .models import Filme, Usuario, Aluguel, Nota, Evento
+from django.db import transaction
 from django.db.models import Avg
 import json
 
 class FilmePorGeneroView(View):
+    campos = CamposSelecionaveis(FilmeRepository.CAMPOS)
     
     def get(self, request, *args, **kwargs):
         
         genero = kwargs.get('genero')
         try:
-            filmes = FilmeRepository.get_filme_por_genero(genero=genero)
+            filmes = FilmeRepository.get_filme_por_genero(genero=genero, campos=self.campos.da_requisicao(request))
             filmes_list = list(filmes)
 
             if not filmes_list:
@@ -102,12 +144,13 @@ class FilmePorGeneroView(View):
             return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
 
 class FilmePorNomeView(View):
+    campos = CamposSelecionaveis(FilmeRepository.CAMPOS)
 
     def get(self, request, *args, **kwargs):
        
         nome = kwargs.get('nome')
         try:
-            filme = FilmeRepository.get_filme_por_nome(nome=nome)
+            filme = FilmeRepository.get_filme_por_nome(nome=nome, campos=self.campos.da_requisicao(request))
             filmes_list = list(filme)
 
             if not filmes_list:
@@ -125,19 +168,29 @@ class AlugarFilmePorNomeView(View):
       
         try:
             email_usuario = kwargs.get('email')
-            usuario = Usuario.objects.get(email=email_usuario)
-            filme_para_alugar = json.loads(request.body)
-            filme = Filme.objects.filter(nome__iexact=filme_para_alugar).first()
 
-            if not filme:
-                return JsonResponse({'status': 'erro', 'mensagem': 'Filme não encontrado'}, status=404)
+            with transaction.atomic():
+                # Com a tabela de aluguéis particionada o banco não garante a unicidade de (usuario, filme),
+                # então a linha do usuário é bloqueada para serializar a verificação e a criação do aluguel.
+                usuario = Usuario.objects.select_for_update().get(email=email_usuario)
+                filme_para_alugar = json.loads(request.body)
+                filme = Filme.objects.filter(nome__iexact=filme_para_alugar).first()
+
+                if not filme:
+                    return JsonResponse({'status': 'erro', 'mensagem': 'Filme não encontrado'}, status=404)
+
+                if Aluguel.objects.filter(usuario=usuario, filme=filme).exists():
+                    return JsonResponse({'status': 'erro', 'mensagem': f'Você já alugou o filme {filme.nome}'}, status=400)
+
+                aluguel = Aluguel.objects.create(usuario=usuario, filme=filme)
+                EventoRepository.registrar(Evento.ALUGUEL_CRIADO, {
+                    'aluguel_id': aluguel.id,
+                    'usuario': usuario.email,
+                    'filme': filme.nome,
+                    'data_de_locacao': aluguel.data_de_locacao,
+                })
+            return JsonResponse({'status': 'sucesso', 'mensagem': f'Filme {filme.nome} alugado com sucesso!'}, status=201)
 
-            if not Aluguel.objects.filter(usuario=usuario, filme=filme).exists():
-                Aluguel.objects.create(usuario=usuario, filme=filme)
-                return JsonResponse({'status': 'sucesso', 'mensagem': f'Filme {filme.nome} alugado com sucesso!'}, status=201)
-            else:
-                return JsonResponse({'status': 'erro', 'mensagem': f'Você já alugou o filme {filme.nome}'}, status=400)
-            
         except Usuario.DoesNotExist:
             return JsonResponse({'status': 'erro', 'mensagem': 'Usuário não encontrado'}, status=404)
         except Filme.DoesNotExist:
@@ -162,14 +215,25 @@ class DarNotaAoFilmeAlugadoView(View):
                 return JsonResponse({'status': 'erro', 'mensagem': f'A nota que você digitou ({nota_atribuida_ao_filme}) não é permitida. A nota deve ser entre 0.0 a 10.0.'}, status=400)
             
             if not NotaRepository.get_nota_by_usuario_e_filme(usuario=usuario, filme=filme).exists():
-                NotaRepository.create_nota(usuario=usuario, filme=filme, nota_atribuida_ao_filme=nota_atribuida_ao_filme)
+                with transaction.atomic():
+                    # Bloqueia o filme para que avaliações simultâneas não percam incrementos do histograma.
+                    filme = Filme.objects.select_for_update().get(nome=filme.nome)
+                    nota = NotaRepository.create_nota(usuario=usuario, filme=filme, nota_atribuida_ao_filme=nota_atribuida_ao_filme)
+
+                    total_avaliacoes = Nota.objects.filter(filme=filme).count()
+                    nota_final = Nota.objects.filter(filme=filme).aggregate(Avg('nota_atribuida_ao_filme'))['nota_atribuida_ao_filme__avg']
 
-                total_avaliacoes = Nota.objects.filter(filme=filme).count()
-                nota_final = Nota.objects.filter(filme=filme).aggregate(Avg('nota_atribuida_ao_filme'))['nota_atribuida_ao_filme__avg']
+                    filme.total_avaliacoes = total_avaliacoes
+                    filme.nota_final = nota_final
+                    filme.histograma_notas = adicionar_nota(filme.histograma_notas, nota_atribuida_ao_filme)
+                    filme.save(update_fields=['total_avaliacoes', 'nota_final', 'histograma_notas'])
 
-                filme.total_avaliacoes = total_avaliacoes
-                filme.nota_final = nota_final
-                filme.save()
+                    EventoRepository.registrar(Evento.NOTA_CRIADA, {
+                        'nota_id': nota.id,
+                        'usuario': usuario.email,
+                        'filme': filme.nome,
+                        'nota': nota_atribuida_ao_filme,
+                    })
 
                 return JsonResponse({'status': 'sucesso', 'mensagem': f'Nota {nota_atribuida_ao_filme} atribuída ao filme: {filme.nome}'}, status=201)
             else:
@@ -183,34 +247,72 @@ class DarNotaAoFilmeAlugadoView(View):
             return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
    
 class VerFilmesAlugadosView(View):
+    campos = CamposSelecionaveis(AluguelRepository.COLUNAS_FILMES_ALUGADOS)
     
     def get(self, request, *args, **kwargs):
        
         try:
             usuario = kwargs.get('email')
-            alugueis = AluguelRepository.get_filmes_alugados(usuario=usuario)
+            campos = self.campos.da_requisicao(request)
 
             if not UsuarioRepository.get_usuario_by_email(email=usuario).exists():
                 return JsonResponse({'status': 'erro', 'mensagem': 'Usuário não encontrado'}, status=404)
 
-            filmes_data = []
-            for aluguel in alugueis:
-                try:
-                    nota_do_filme = Nota.objects.get(filme=aluguel.filme, usuario=aluguel.usuario).nota_atribuida_ao_filme
-                except Nota.DoesNotExist:
-                    nota_do_filme = None
-
-                filmes_data.append({
-                    'id': aluguel.id,
-                    'nome_filme': aluguel.filme.nome,
-                    'genero_filme': aluguel.filme.genero,
-                    'lancamento_filme': aluguel.filme.ano,
-                    'diretor_filme': aluguel.filme.diretor,
-                    'sinopse_filme': aluguel.filme.sinopse,
-                    'email_usuario': aluguel.usuario.email,
-                    'nota_do_filme': nota_do_filme,
-                    'data_de_locacao': aluguel.data_de_locacao
-                })
+            filmes_data = list(AluguelRepository.get_filmes_alugados_campos(usuario=usuario, campos=campos))
             return JsonResponse(filmes_data, safe=False)
         except Exception as e:
             return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
+
+class EstatisticasDoFilmeView(View):
+
+    def get(self, request, *args, **kwargs):
+
+        nome = kwargs.get('nome')
+        try:
+            filme = FilmeRepository.get_estatisticas(nome=nome)
+
+            if not filme:
+                return JsonResponse({'status': 'erro', 'mensagem': f'Nenhum filme chamado {nome} foi encontrado'}, status=404)
+
+            return JsonResponse({
+                'nome': filme['nome'],
+                'total_avaliacoes': filme['total_avaliacoes'],
+                'nota_final': filme['nota_final'],
+                **resumo(filme['histograma_notas']),
+            }, status=200)
+        except Exception as e:
+            return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
+
+class GenerosView(View):
+
+    def get(self, request, *args, **kwargs):
+
+        try:
+            generos = list(GeneroRepository.get_generos_com_filmes())
+            return JsonResponse(generos, safe=False, status=200)
+        except Exception as e:
+            return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class FilmesPorNomesView(View):
+    campos = CamposSelecionaveis(FilmeRepository.CAMPOS)
+
+    def post(self, request, *args, **kwargs):
+
+        try:
+            nomes = json.loads(request.body)
+
+            if not isinstance(nomes, list) or not all(isinstance(nome, str) for nome in nomes):
+                return JsonResponse({'status': 'erro', 'mensagem': 'Envie uma lista com os nomes dos filmes.'}, status=400)
+
+            if len(nomes) > settings.FILMES_POR_NOMES_MAXIMO:
+                return JsonResponse({'status': 'erro', 'mensagem': f'Envie no máximo {settings.FILMES_POR_NOMES_MAXIMO} nomes por requisição.'}, status=400)
+
+            filmes = FilmeRepository.get_filmes_por_nomes(nomes=nomes, campos=self.campos.da_requisicao(request))
+            resultados = [
+                {'nome_solicitado': nome, 'encontrado': filmes[nome] is not None, 'filme': filmes[nome]}
+                for nome in nomes
+            ]
+            return JsonResponse({'resultados': resultados}, status=200)
+        except Exception as e:
+            return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
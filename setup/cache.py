@@ -0,0 +1,40 @@
+"""
+Configuração do cache do Django a partir de uma URL (variável `CACHE_URL`).
+
+Esquemas aceitos:
+
+- `redis://[:senha@]host:porta/banco` (ou `rediss://`): Redis via `django-redis`;
+- `memcache://host:porta[,host:porta...]`: Memcached via `pymemcache`;
+- `locmem://`: memória local do processo (padrão; não é compartilhado entre workers);
+- `dummy://`: sem cache.
+
+`django-redis` e `pymemcache` estão em `setup/requirements-opcional.txt`.
+"""
+
+from urllib.parse import urlsplit
+
+BACKENDS = {
+    'redis': 'django_redis.cache.RedisCache',
+    'rediss': 'django_redis.cache.RedisCache',
+    'memcache': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def cache_da_url(url):
+    """
+    Retorna a configuração de um alias de `CACHES` para a URL informada.
+    """
+    partes = urlsplit(url)
+    if partes.scheme not in BACKENDS:
+        raise ValueError(f"Esquema de cache não suportado: '{partes.scheme}'. Use um de: {', '.join(BACKENDS)}.")
+
+    configuracao = {'BACKEND': BACKENDS[partes.scheme]}
+    if partes.scheme in ('redis', 'rediss'):
+        configuracao['LOCATION'] = url
+    elif partes.scheme == 'memcache':
+        configuracao['LOCATION'] = partes.netloc.split(',')
+    elif partes.scheme == 'locmem':
+        configuracao['LOCATION'] = partes.netloc
+    return configuracao
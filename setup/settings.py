@@ -1,7 +1,8 @@
 
 from pathlib import Path
 from decouple import config, Csv
-import environ
+
+from setup.cache import cache_da_url
 
 # BASE_DIR define o caminho base do projeto. É usado para definir outros caminhos no projeto.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,7 +15,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY')
 
 # Define se o projeto está em modo de depuração (DEBUG) ou não. Nunca habilite o DEBUG em produção.
-DEBUG = config('DEBUG')
+DEBUG = config('DEBUG', cast=bool)
 
 # Define quais hosts podem acessar o projeto. Utiliza uma lista de hosts fornecida no arquivo de ambiente.
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
@@ -42,6 +43,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',  # Protege contra ataques de clickjacking
 ]
 
+# Define se a interface administrativa é carregada. As views da API não dependem dela, então workers
+# que atendem apenas a API podem desabilitá-la (ADMIN_HABILITADO=False) para não importar o admin,
+# a autenticação, as sessões, as mensagens e os arquivos estáticos, reduzindo o tempo de inicialização e a memória.
+ADMIN_HABILITADO = config('ADMIN_HABILITADO', default=True, cast=bool)
+
+if not ADMIN_HABILITADO:
+    APPS_DO_ADMIN = [
+        'django.contrib.admin',
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    ]
+    MIDDLEWARE_DO_ADMIN = [
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    ]
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in APPS_DO_ADMIN]
+    MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in MIDDLEWARE_DO_ADMIN]
+
+# Captura de perfis de requisições (veja filmestop/perfil.py). Desabilitada por padrão; quando
+# desabilitada, o middleware nem entra na lista e não há custo algum por requisição.
+PERFIL_HABILITADO = config('PERFIL_HABILITADO', default=False, cast=bool)
+PERFIL_MODO = config('PERFIL_MODO', default='amostragem')  # 'amostragem' ou 'cprofile'
+PERFIL_TAXA_AMOSTRAGEM = config('PERFIL_TAXA_AMOSTRAGEM', default=0.01, cast=float)  # Fração das requisições gravadas
+PERFIL_LIMITE_MS = config('PERFIL_LIMITE_MS', default=500, cast=int)  # Requisições mais lentas que isso são sempre gravadas
+PERFIL_INTERVALO_MS = config('PERFIL_INTERVALO_MS', default=5, cast=int)  # Intervalo entre amostras de pilha
+PERFIL_DIR = config('PERFIL_DIR', default=str(BASE_DIR / 'perfis'))
+PERFIL_MAX_ARQUIVOS = config('PERFIL_MAX_ARQUIVOS', default=50, cast=int)  # Arquivos mantidos por URL
+
+if PERFIL_HABILITADO:
+    MIDDLEWARE = ['filmestop.perfil.PerfilMiddleware'] + MIDDLEWARE
+
 # Especifica o arquivo de configuração de URLs principal do projeto.
 ROOT_URLCONF = 'setup.urls'
 
@@ -67,19 +103,17 @@ TEMPLATES = [
 WSGI_APPLICATION = 'setup.wsgi.application'
 
 # Configurações do banco de dados.
-# Utiliza o pacote `environ` para carregar as variáveis do ambiente a partir do arquivo `.env`.
-env = environ.Env()
-environ.Env.read_env(env_file='./.env')  # Carrega as variáveis de ambiente do arquivo .env
+# As variáveis são lidas do ambiente ou do arquivo `.env` pelo `decouple`, como as demais configurações.
 
 # Configuração para o uso do banco de dados PostgreSQL.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',  # Usa o backend do PostgreSQL
-        'NAME': env('DB_NAME'),  # Nome do banco de dados
-        'USER': env('DB_USER'),  # Usuário do banco de dados
-        'PASSWORD': env('DB_PASSWORD'),  # Senha do banco de dados
-        'HOST': env('DB_HOST'),  # Endereço do servidor do banco de dados
-        'PORT': env('DB_PORT'),  # Porta do servidor do banco de dados
+        'NAME': config('DB_NAME'),  # Nome do banco de dados
+        'USER': config('DB_USER'),  # Usuário do banco de dados
+        'PASSWORD': config('DB_PASSWORD'),  # Senha do banco de dados
+        'HOST': config('DB_HOST'),  # Endereço do servidor do banco de dados
+        'PORT': config('DB_PORT'),  # Porta do servidor do banco de dados
     }
 }
 
@@ -118,3 +152,25 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Particionamento e arquivamento de aluguéis.
+# Quando ativado (e apenas no PostgreSQL), a tabela de aluguéis é particionada por mês de locação.
+# Em outros bancos (ex.: SQLite) a tabela permanece comum e os comandos apenas arquivam por DELETE.
+ALUGUEL_PARTICIONADO = config('ALUGUEL_PARTICIONADO', default=False, cast=bool)
+# Quantidade de meses de histórico mantidos no banco antes do arquivamento.
+ALUGUEL_MESES_RETIDOS = config('ALUGUEL_MESES_RETIDOS', default=12, cast=int)
+# Diretório onde os arquivos compactados (JSONL + gzip) dos aluguéis arquivados são gravados.
+ALUGUEL_ARQUIVO_DIR = config('ALUGUEL_ARQUIVO_DIR', default=str(BASE_DIR / 'arquivo'))
+
+# Cache do Django, configurado por uma URL (veja setup/cache.py), ex.: redis://redis:6379/0 ou
+# memcache://memcached:11211. O padrão é a memória local do processo, que não é compartilhada entre workers.
+CACHES = {
+    'default': cache_da_url(config('CACHE_URL', default='locmem://')),
+}
+
+# Cache por filme usado pela busca de filmes em lote por nome (filmes/nomes/).
+# 0 desabilita o cache; caso contrário, é o tempo (s) que cada filme permanece no cache.
+# Exige um cache compartilhado entre os workers (a verificação filmestop.E001 recusa a memória local).
+FILME_CACHE_TIMEOUT = config('FILME_CACHE_TIMEOUT', default=0, cast=int)
+FILME_CACHE_ALIAS = config('FILME_CACHE_ALIAS', default='default')
+# Quantidade máxima de nomes aceitos em uma única busca em lote.
+FILMES_POR_NOMES_MAXIMO = config('FILMES_POR_NOMES_MAXIMO', default=100, cast=int)
@@ -51,23 +51,53 @@ Esta configuração define as rotas para a aplicação de gerenciamento de filme
      - Atualiza o total de avaliações e a nota final do filme com base nas notas atribuídas.
      - Retorna uma mensagem de sucesso ou erro dependendo do resultado da operação. Se o usuário ou o filme não forem encontrados ou se a nota estiver fora do intervalo permitido, retorna um erro apropriado.
    - **Nome da URL:** `dar_nota_ao_filme`
+
+6. **URL: `filmes/estatisticas/<str:nome>/`**
+   - **View Associada:** `EstatisticasDoFilmeView`
+   - **Parâmetro:** `nome` (do tipo `str`)
+     - Descrição: O nome do filme cujas estatísticas de notas serão retornadas.
+   - **Lógica de Negócio:**
+     - Lê o histograma de notas pré-calculado do filme e retorna a distribuição, a mediana e os percentis, sem percorrer as notas.
+   - **Nome da URL:** `estatisticas_do_filme`
+
+7. **URL: `filmes/generos/`**
+   - **View Associada:** `GenerosView`
+   - **Lógica de Negócio:**
+     - Retorna os gêneros com filmes e a quantidade de filmes de cada um, a partir dos totais mantidos na tabela de gêneros.
+   - **Nome da URL:** `generos`
+
+8. **URL: `filmes/nomes/`**
+   - **View Associada:** `FilmesPorNomesView`
+   - **Lógica de Negócio:**
+     - Recebe uma lista de nomes de filmes (no corpo da requisição em formato JSON) e retorna, em uma única resposta, o filme encontrado ou `null` para cada nome, substituindo uma chamada a `filmes/nome/<str:nome>/` por filme.
+   - **Nome da URL:** `filmes_por_nomes`
 """
 
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from filmestop.views import (
     FilmePorGeneroView,
     FilmePorNomeView,
     AlugarFilmePorNomeView,
     VerFilmesAlugadosView,
-    DarNotaAoFilmeAlugadoView
+    DarNotaAoFilmeAlugadoView,
+    EstatisticasDoFilmeView,
+    GenerosView,
+    FilmesPorNomesView
 )
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('filmes/genero/<str:genero>/', FilmePorGeneroView.as_view(), name='filmes_por_genero'),
     path('filmes/nome/<str:nome>/', FilmePorNomeView.as_view(), name='filme_por_nome'),
     path('filmes/alugar/<str:email>/', AlugarFilmePorNomeView.as_view(), name='alugar_filme'),
     path('filmes/alugados/<str:email>/', VerFilmesAlugadosView.as_view(), name='filmes_alugados'),
-    path('filmes/nota/<str:email>/<str:nome>', DarNotaAoFilmeAlugadoView.as_view(), name='dar_nota_ao_filme')
+    path('filmes/nota/<str:email>/<str:nome>', DarNotaAoFilmeAlugadoView.as_view(), name='dar_nota_ao_filme'),
+    path('filmes/estatisticas/<str:nome>/', EstatisticasDoFilmeView.as_view(), name='estatisticas_do_filme'),
+    path('filmes/generos/', GenerosView.as_view(), name='generos'),
+    path('filmes/nomes/', FilmesPorNomesView.as_view(), name='filmes_por_nomes'),
 ]
+
+if settings.ADMIN_HABILITADO:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))